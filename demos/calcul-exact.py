@@ -6,6 +6,8 @@ Calcule la moyenne exacte d'une fonction de 3 variables aléatoires.
 """
 
 import openturns as ot
+import numpy as np
+import otmarkov
 
 P = ot.Normal()
 Q = ot.Normal()
@@ -16,3 +18,12 @@ mu = F.getMean()[0]
 print("Mean=%f" % (mu))
 sigma = F.getStandardDeviation()[0]
 print("Mean=%f" % (mu))
+
+# Propage les moments avec la chaîne affine
+nbSteps = 4
+innovation = P * Q + R
+affine_chain = otmarkov.AffineMarkovChain([[1.0]], innovation, nbSteps, [0.0])
+mu = affine_chain.computeMean()[0]
+print("Mean=%f" % (mu))
+sigma = np.sqrt(affine_chain.computeCovariance()[0, 0])
+print("Standard deviation=%f" % (sigma))
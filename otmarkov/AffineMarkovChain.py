@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Michaël Baudin
+
+Defines a Markov chain with an affine step.
+"""
+
+import openturns as ot
+import numpy as np
+
+
+class AffineMarkovChain:
+    """A Markov chain with an affine step."""
+
+    def __init__(self, state_matrix, innovation, number_of_steps, initial_state):
+        """
+        Create a new affine Markov chain.
+
+        The step is:
+
+            state_{n+1} = A state_n + g(X_n)
+
+        where A is the state matrix and the innovations g(X_0), g(X_1), ...
+        are independent with the same distribution.
+        Hence, the final state is:
+
+            state_N = A^N state_0 + sum_{k=0}^{N-1} A^{N-1-k} g(X_k).
+
+        The mean and the covariance of the state are propagated exactly
+        from the mean and covariance of the innovation, with a cost
+        which is linear with respect to the number of steps.
+        The state matrix of a otmarkov.MarkovChain can be computed with
+        its getStateMatrix() method and the distribution of the innovation
+        can often be built with the arithmetic of ot.Distribution,
+        e.g. P * Q + R.
+
+        Parameters
+        ----------
+        state_matrix : ot.Matrix(d, d)
+            The matrix A.
+        innovation : ot.Distribution
+            The distribution of g(X), of dimension d.
+        number_of_steps : int
+            The number of steps within the chain
+        initial_state : ot.Point(d)
+            The value of the initial state
+        """
+        state_matrix = np.atleast_2d(np.array(state_matrix, dtype=float))
+        state_dimension = len(initial_state)
+        if state_matrix.shape != (state_dimension, state_dimension):
+            raise ValueError(
+                "The state matrix has shape %s "
+                "but the dimension of the state is %d"
+                % (state_matrix.shape, state_dimension)
+            )
+        if innovation.getDimension() != state_dimension:
+            raise ValueError(
+                "The dimension of the innovation is %d "
+                "but the dimension of the state is %d"
+                % (innovation.getDimension(), state_dimension)
+            )
+        self.state_matrix = state_matrix
+        self.innovation = innovation
+        self.number_of_steps = number_of_steps
+        self.initial_state = ot.Point(initial_state)
+        return None
+
+    def __reduce__(self):
+        """Return the definition of the chain for pickle."""
+        arguments = (
+            self.state_matrix,
+            self.innovation,
+            self.number_of_steps,
+            np.array(self.initial_state),
+        )
+        return (self.__class__, arguments)
+
+    def getStateDimension(self):
+        """
+        Return the dimension of the state.
+
+        Returns
+        -------
+        state_dimension : int
+            The dimension of the state.
+
+        """
+        return self.initial_state.getDimension()
+
+    def computeMeanHistory(self):
+        """
+        Compute the mean of the state at each step.
+
+        Returns
+        -------
+        mean_history : ot.Sample(number_of_steps + 1, d)
+            The mean of the state, from the initial state to the final state.
+
+        """
+        A = self.state_matrix
+        mu = np.array(self.innovation.getMean())
+        mean_history = np.empty((self.number_of_steps + 1, self.getStateDimension()))
+        mean_history[0] = self.initial_state
+        for i in range(self.number_of_steps):
+            mean_history[i + 1] = A @ mean_history[i] + mu
+        return ot.Sample(mean_history)
+
+    def computeCovarianceHistory(self):
+        """
+        Compute the covariance of the state at each step.
+
+        Returns
+        -------
+        covariance_history : list of ot.CovarianceMatrix(d)
+            The covariance of the state, from the initial state
+            to the final state.
+
+        """
+        A = self.state_matrix
+        sigma = np.array(self.innovation.getCovariance())
+        covariance = np.zeros((self.getStateDimension(), self.getStateDimension()))
+        covariance_history = [ot.CovarianceMatrix(covariance)]
+        for i in range(self.number_of_steps):
+            covariance = A @ covariance @ A.T + sigma
+            covariance_history.append(ot.CovarianceMatrix(covariance))
+        return covariance_history
+
+    def computeMean(self):
+        """
+        Compute the mean of the final state.
+
+        Returns
+        -------
+        mean : ot.Point(d)
+            The mean of the final state.
+
+        """
+        return self.computeMeanHistory()[-1]
+
+    def computeCovariance(self):
+        """
+        Compute the covariance of the final state.
+
+        Returns
+        -------
+        covariance : ot.CovarianceMatrix(d)
+            The covariance of the final state.
+
+        """
+        return self.computeCovarianceHistory()[-1]
+
+    def getOutputDistribution(self):
+        """
+        Return the exact distribution of the final state.
+
+        The final state is a linear combination of independent copies of
+        the innovation, which is represented by a ot.RandomMixture.
+        If the dimension of the state is greater than 1, the marginals
+        of the innovation must be independent and the dimension of the
+        state must be lower or equal to 3.
+
+        Returns
+        -------
+        distribution : ot.Distribution
+            The distribution of the final state.
+
+        """
+        if self.number_of_steps == 0:
+            return ot.Dirac(self.initial_state)
+        state_dimension = self.getStateDimension()
+        # The powers of A, from A^{N-1} to A^0
+        powers = [np.eye(state_dimension)]
+        for i in range(self.number_of_steps - 1):
+            powers.append(self.state_matrix @ powers[-1])
+        powers.reverse()
+        constant = self.state_matrix @ powers[0] @ np.array(self.initial_state)
+        if state_dimension == 1:
+            atoms = [self.innovation] * len(powers)
+            weights = [float(power[0, 0]) for power in powers]
+            return ot.RandomMixture(atoms, weights, float(constant[0]))
+        if not self.innovation.hasIndependentCopula():
+            raise ValueError("The marginals of the innovation must be independent")
+        if state_dimension > 3:
+            raise ValueError(
+                "The dimension of the state is %d, but must be lower or equal to 3"
+                % (state_dimension)
+            )
+        marginals = [self.innovation.getMarginal(j) for j in range(state_dimension)]
+        atoms = marginals * len(powers)
+        weights = ot.Matrix(np.hstack(powers))
+        return ot.RandomMixture(atoms, weights, ot.Point(constant))
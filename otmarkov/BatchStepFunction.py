@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Michaël Baudin
+
+Defines a step function which updates a sample of states at once.
+"""
+
+import numpy as np
+
+
+class BatchStepFunction:
+    """Evaluate a step function on a sample of states."""
+
+    def __init__(self, step_function):
+        """
+        Create a new batch step function.
+
+        If the step function is a ot.ParametricFunction, the underlying
+        function is evaluated on a single ot.Sample which gathers the
+        random inputs and the states.
+        If the step function is another ot.Function, the parameter of the
+        step function is set for each state and the step function is
+        evaluated on each point.
+        Otherwise, the step function is a vectorized Python function
+        step_function(states, input_sample) of arrays, which returns the
+        array of new states.
+        This NumPy path does not import OpenTURNS.
+
+        Parameters
+        ----------
+        step_function : ot.Function or function
+            The function which performs the step.
+            Its input is the random input, its parameter is the state
+            and its output is the new state.
+        """
+        self.step_function = step_function
+        self.full_function = None
+        self.input_positions = None
+        self.parameter_positions = None
+        # A vectorized Python function does not have an evaluation
+        self.is_vectorized = not hasattr(step_function, "getEvaluation")
+        if self.is_vectorized:
+            return None
+        import openturns as ot
+
+        evaluation = step_function.getEvaluation().getImplementation()
+        if isinstance(evaluation, ot.ParametricEvaluation):
+            self.full_function = evaluation.getFunction()
+            self.input_positions = list(evaluation.getInputPositions())
+            self.parameter_positions = list(evaluation.getParametersPositions())
+        return None
+
+    def getStepFunction(self):
+        """
+        Return the step function.
+
+        Returns
+        -------
+        step_function : ot.Function or function
+            The function which performs the step.
+
+        """
+        return self.step_function
+
+    def __call__(self, states, input_sample):
+        """
+        Compute the new states.
+
+        Parameters
+        ----------
+        states : array(n, d) or array(d)
+            The current states.
+            If a single state is given, it is used for all inputs.
+        input_sample : array(n, m)
+            The random inputs.
+
+        Returns
+        -------
+        new_states : array(n, d)
+            The new states, as a C-contiguous array.
+
+        """
+        input_sample = np.asarray(input_sample, dtype=float)
+        size = input_sample.shape[0]
+        states = np.asarray(states, dtype=float)
+        if states.ndim == 1:
+            states = np.broadcast_to(states, (size, states.shape[0]))
+        if size == 0:
+            return np.empty((0, states.shape[1]))
+        if self.is_vectorized:
+            new_states = self.step_function(states, input_sample)
+            new_states = np.ascontiguousarray(new_states, dtype=float)
+            return new_states.reshape(size, -1)
+        if self.full_function is None:
+            output_dimension = self.step_function.getOutputDimension()
+            new_states = np.empty((size, output_dimension))
+            for i in range(size):
+                self.step_function.setParameter(states[i])
+                new_states[i] = self.step_function(input_sample[i])
+            return new_states
+        full_input = np.empty((size, self.full_function.getInputDimension()))
+        full_input[:, self.input_positions] = input_sample
+        full_input[:, self.parameter_positions] = states
+        new_states = np.ascontiguousarray(self.full_function(full_input))
+        return new_states
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Michaël Baudin
+
+Defines a continuous time Markov chain on a finite state space.
+"""
+
+import numpy as np
+
+
+class ContinuousTimeMarkovChain:
+    """A continuous time Markov chain with a finite number of states."""
+
+    def __init__(self, generator, initial_state=0):
+        """
+        Create a new continuous time Markov chain.
+
+        The states are the integers 0, 1, ..., m - 1.
+        The off-diagonal coefficient Q[i, j] of the generator is the rate
+        of the transition from state i to state j, and the diagonal
+        coefficient is such that each row sums to zero.
+        For example, a component with failure rate lambda and repair
+        rate mu has the generator:
+
+            Q = [[-lambda, lambda], [mu, -mu]].
+
+        Parameters
+        ----------
+        generator : ot.SquareMatrix(m)
+            The generator matrix Q.
+        initial_state : int or sequence of float
+            The initial state or the probability of each initial state.
+        """
+        generator = np.array(generator, dtype=float)
+        number_of_states = generator.shape[0]
+        if generator.shape != (number_of_states, number_of_states):
+            raise ValueError("The generator must be a square matrix")
+        off_diagonal = generator - np.diag(np.diag(generator))
+        if np.any(off_diagonal < 0.0):
+            raise ValueError("The off-diagonal rates must be nonnegative")
+        scale = 1.0 + np.max(np.abs(generator))
+        if not np.allclose(np.sum(generator, axis=1), 0.0, atol=1.0e-12 * scale):
+            raise ValueError("The rows of the generator must sum to zero")
+        if np.ndim(initial_state) == 0:
+            initial_probabilities = np.zeros(number_of_states)
+            initial_probabilities[int(initial_state)] = 1.0
+        else:
+            initial_probabilities = np.array(initial_state, dtype=float)
+            if initial_probabilities.shape != (number_of_states,):
+                raise ValueError(
+                    "The number of initial probabilities is %d, but must be %d"
+                    % (len(initial_probabilities), number_of_states)
+                )
+        self.generator = generator
+        self.initial_probabilities = initial_probabilities
+        # The total rate of leaving each state
+        self.exit_rates = np.sum(off_diagonal, axis=1)
+        # The cumulated probabilities of the jumps from each state
+        with np.errstate(divide="ignore", invalid="ignore"):
+            jump_probabilities = off_diagonal / self.exit_rates[:, np.newaxis]
+        jump_probabilities[self.exit_rates == 0.0] = 0.0
+        self.cumulated_jump_probabilities = np.cumsum(jump_probabilities, axis=1)
+        return None
+
+    def __reduce__(self):
+        """
+        Return the definition of the chain for pickle.
+
+        The jump probabilities are computed again from the generator.
+        """
+        return (self.__class__, (self.generator, self.initial_probabilities))
+
+    def save(self, filename):
+        """
+        Save the chain to a .npz file.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file.
+
+        Returns
+        -------
+        None.
+
+        """
+        np.savez(
+            filename,
+            generator=self.generator,
+            initial_probabilities=self.initial_probabilities,
+        )
+        return None
+
+    @staticmethod
+    def load(filename):
+        """
+        Load a chain from a .npz file.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file.
+
+        Returns
+        -------
+        chain : otmarkov.ContinuousTimeMarkovChain
+            The chain.
+
+        """
+        with np.load(filename) as data:
+            chain = ContinuousTimeMarkovChain(
+                data["generator"], data["initial_probabilities"]
+            )
+        return chain
+
+    def getNumberOfStates(self):
+        """
+        Return the number of states.
+
+        Returns
+        -------
+        number_of_states : int
+            The number of states.
+
+        """
+        return self.generator.shape[0]
+
+    def getGenerator(self):
+        """
+        Return the generator.
+
+        Returns
+        -------
+        generator : ot.SquareMatrix(m)
+            The generator matrix.
+
+        """
+        import openturns as ot
+
+        return ot.SquareMatrix(self.generator)
+
+    def getAbsorbingChain(self, absorbing_states):
+        """
+        Return the chain where some states are absorbing.
+
+        Parameters
+        ----------
+        absorbing_states : sequence of int
+            The states which cannot be left, e.g. the failed states.
+
+        Returns
+        -------
+        chain : otmarkov.ContinuousTimeMarkovChain
+            The chain where the rates from the absorbing states are zero.
+
+        """
+        generator = self.generator.copy()
+        generator[list(absorbing_states), :] = 0.0
+        chain = ContinuousTimeMarkovChain(generator, self.initial_probabilities)
+        return chain
+
+    def _sampleStates(self, cumulated_probabilities, uniforms):
+        """Sample states from the rows of cumulated probabilities."""
+        states = np.sum(cumulated_probabilities <= uniforms[:, np.newaxis], axis=1)
+        # Round-off errors in the cumulated probabilities
+        return np.minimum(states, self.getNumberOfStates() - 1)
+
+    def getStateSample(self, size, times, random_generator=None):
+        """
+        Return the states of systems at given times.
+
+        The trajectories of all systems are simulated at once with the
+        Gillespie algorithm: at each iteration, the holding time and the
+        next state of each system are sampled, until the largest time is
+        reached.
+
+        Parameters
+        ----------
+        size : int
+            The number of systems.
+        times : sequence of float
+            The increasing times at which the states are observed.
+        random_generator : np.random.Generator, optional
+            The generator of the uniform numbers.
+            If None, ot.RandomGenerator is used.
+
+        Returns
+        -------
+        states : array(size, number_of_times) of int
+            The state of each system at each time.
+
+        """
+        if random_generator is None:
+            import openturns as ot
+
+            def generate(n):
+                return np.array(ot.RandomGenerator.Generate(n))
+
+        else:
+            generate = random_generator.random
+        times = np.asarray(times, dtype=float)
+        number_of_times = len(times)
+        uniforms = generate(size)
+        initial_cumulated = np.cumsum(self.initial_probabilities)
+        states = self._sampleStates(
+            np.tile(initial_cumulated, (size, 1)), uniforms * initial_cumulated[-1]
+        )
+        current_times = np.zeros(size)
+        observed_states = np.empty((size, number_of_times), dtype=int)
+        # The index of the next observation time of each system
+        next_time_indices = np.zeros(size, dtype=int)
+        active = np.arange(size)
+        while len(active) > 0:
+            active_states = states[active]
+            uniforms = generate(2 * len(active))
+            uniforms = uniforms.reshape(len(active), 2)
+            rates = self.exit_rates[active_states]
+            with np.errstate(divide="ignore"):
+                holding_times = -np.log1p(-uniforms[:, 0]) / rates
+            jump_times = current_times[active] + holding_times
+            # The state is observed at the times before the jump
+            end_indices = np.searchsorted(times, jump_times, side="left")
+            counts = end_indices - next_time_indices[active]
+            rows = np.repeat(active, counts)
+            offsets = np.arange(np.sum(counts)) - np.repeat(
+                np.cumsum(counts) - counts, counts
+            )
+            columns = np.repeat(next_time_indices[active], counts) + offsets
+            observed_states[rows, columns] = np.repeat(active_states, counts)
+            next_time_indices[active] = end_indices
+            current_times[active] = jump_times
+            # Jump to the next state
+            states[active] = self._sampleStates(
+                self.cumulated_jump_probabilities[active_states], uniforms[:, 1]
+            )
+            active = active[end_indices < number_of_times]
+        return observed_states
+
+    def computeTransientProbabilities(self, times, tolerance=1.0e-12):
+        """
+        Compute the probability of each state at given times.
+
+        The probabilities are computed with the uniformization method.
+        Let Lambda be the largest exit rate and P = I + Q / Lambda.
+        Then:
+
+            p(t) = sum_{k >= 0} exp(-Lambda t) (Lambda t)^k / k! p(0) P^k.
+
+        The vectors p(0) P^k are computed once for all times and the sum
+        is truncated when the remaining Poisson probability at the largest
+        time is lower than the tolerance.
+
+        Parameters
+        ----------
+        times : sequence of float
+            The nonnegative times.
+        tolerance : float
+            The truncation error of the series.
+
+        Returns
+        -------
+        probabilities : array(number_of_times, m)
+            The probability of each state at each time.
+
+        """
+        times = np.asarray(times, dtype=float)
+        number_of_states = self.getNumberOfStates()
+        uniformization_rate = np.max(self.exit_rates)
+        if uniformization_rate == 0.0:
+            return np.tile(self.initial_probabilities, (len(times), 1))
+        P = np.eye(number_of_states) + self.generator / uniformization_rate
+        # The number of terms of the series at the largest time
+        mean = uniformization_rate * np.max(times)
+        maximum_number_of_terms = int(mean + 10.0 * np.sqrt(mean) + 50)
+        k = np.arange(maximum_number_of_terms)
+        log_factorials = np.concatenate(([0.0], np.cumsum(np.log(k[1:]))))
+        if mean > 0.0:
+            poisson_probabilities = np.exp(-mean + k * np.log(mean) - log_factorials)
+        else:
+            poisson_probabilities = (k == 0).astype(float)
+        cumulated_weights = np.cumsum(poisson_probabilities)
+        number_of_terms = int(np.searchsorted(cumulated_weights, 1.0 - tolerance)) + 1
+        number_of_terms = min(number_of_terms, maximum_number_of_terms)
+        # The vectors p(0) P^k
+        vectors = np.empty((number_of_terms, number_of_states))
+        vectors[0] = self.initial_probabilities
+        for i in range(1, number_of_terms):
+            vectors[i] = vectors[i - 1] @ P
+        # The Poisson weights at each time
+        k = k[:number_of_terms]
+        lambda_t = uniformization_rate * times[:, np.newaxis]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_weights = (
+                -lambda_t + k * np.log(lambda_t) - log_factorials[:number_of_terms]
+            )
+        weights = np.exp(log_weights)
+        # At time zero, only the first term remains
+        weights[times == 0.0] = k == 0
+        probabilities = weights @ vectors
+        return probabilities
+
+    def computeAvailability(self, times, up_states):
+        """
+        Compute the availability at given times.
+
+        The availability is the probability that the system is in an
+        up state at the given time.
+
+        Parameters
+        ----------
+        times : sequence of float
+            The nonnegative times.
+        up_states : sequence of int
+            The states in which the system works.
+
+        Returns
+        -------
+        availability : array(number_of_times)
+            The availability at each time.
+
+        """
+        probabilities = self.computeTransientProbabilities(times)
+        availability = np.sum(probabilities[:, list(up_states)], axis=1)
+        return availability
+
+    def computeReliability(self, times, up_states):
+        """
+        Compute the reliability at given times.
+
+        The reliability is the probability that the system has stayed in
+        the up states up to the given time.
+        It is the availability of the chain where the down states are
+        absorbing.
+
+        Parameters
+        ----------
+        times : sequence of float
+            The nonnegative times.
+        up_states : sequence of int
+            The states in which the system works.
+
+        Returns
+        -------
+        reliability : array(number_of_times)
+            The reliability at each time.
+
+        """
+        down_states = [
+            i for i in range(self.getNumberOfStates()) if i not in list(up_states)
+        ]
+        absorbing_chain = self.getAbsorbingChain(down_states)
+        reliability = absorbing_chain.computeAvailability(times, up_states)
+        return reliability
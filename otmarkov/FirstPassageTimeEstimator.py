@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Michaël Baudin
+
+Defines the estimation of the first passage time of a Markov process.
+"""
+
+import numpy as np
+
+
+class FirstPassageTimeEstimator:
+    """Estimate the distribution of the first passage time of a Markov process."""
+
+    def __init__(self, markov_process, time_index=None):
+        """
+        Create a new first passage time estimator.
+
+        The first passage time of a trajectory is the first step at which
+        the stoping rule of the process is satisfied.
+        If the rule is not satisfied within the maximum number of steps,
+        the trajectory is censored.
+        All trajectories are simulated at once and only the current states
+        are stored, not the histories.
+
+        Parameters
+        ----------
+        markov_process : otmarkov.MarkovProcess
+            The Markov process.
+        time_index : int, optional
+            The index of the component of the state which is the time,
+            e.g. the cumulated life time of a component.
+            If None, the time is the number of steps.
+        """
+        self.markov_process = markov_process
+        self.time_index = time_index
+        self.hitting_steps = None
+        self.hitting_times = None
+        self.censored = None
+        return None
+
+    def run(self, size):
+        """
+        Simulate the trajectories until their first passage.
+
+        Parameters
+        ----------
+        size : int
+            The number of trajectories.
+
+        Returns
+        -------
+        None.
+
+        """
+        initial_state = np.asarray(self.markov_process.initial_state, dtype=float)
+        states = np.tile(initial_state, (size, 1))
+        states, hitting_steps, stopped = self.markov_process.advanceStates(states)
+        self.hitting_steps = hitting_steps
+        self.censored = ~stopped
+        if self.time_index is None:
+            self.hitting_times = hitting_steps.astype(float)
+        else:
+            self.hitting_times = states[:, self.time_index].copy()
+        return None
+
+    def _checkRun(self):
+        """Check that the trajectories are simulated."""
+        if self.hitting_steps is None:
+            raise ValueError("The trajectories are not simulated: run() must be called")
+        return None
+
+    def getHittingSteps(self):
+        """
+        Return the first passage steps.
+
+        Returns
+        -------
+        hitting_steps : array(size) of int
+            The step at which each trajectory stops.
+            If the trajectory is censored, this is the maximum number of steps.
+
+        """
+        self._checkRun()
+        return self.hitting_steps
+
+    def getHittingTimes(self):
+        """
+        Return the first passage times.
+
+        Returns
+        -------
+        hitting_times : array(size)
+            The time at which each trajectory stops.
+            If the trajectory is censored, this is the time at the
+            maximum number of steps.
+
+        """
+        self._checkRun()
+        return self.hitting_times
+
+    def getCensored(self):
+        """
+        Return the censoring indicators.
+
+        Returns
+        -------
+        censored : array(size) of bool
+            True if the trajectory did not stop within the maximum
+            number of steps.
+
+        """
+        self._checkRun()
+        return self.censored
+
+    def _computeKaplanMeier(self):
+        """
+        Compute the Kaplan-Meier estimator.
+
+        Returns
+        -------
+        event_times : array(k)
+            The distinct times of the uncensored trajectories.
+        survival : array(k)
+            The survival function just after each event time.
+
+        """
+        self._checkRun()
+        order = np.argsort(self.hitting_times, kind="stable")
+        times = self.hitting_times[order]
+        events = ~self.censored[order]
+        event_times, first_index = np.unique(times, return_index=True)
+        # Number of trajectories at risk and number of events at each time
+        at_risk = len(times) - first_index
+        number_of_events = np.add.reduceat(events.astype(int), first_index)
+        keep = number_of_events > 0
+        factors = 1.0 - number_of_events[keep] / at_risk[keep]
+        survival = np.cumprod(factors)
+        return event_times[keep], survival
+
+    def computeSurvivalFunction(self, times):
+        """
+        Compute the empirical survival function.
+
+        The survival function is estimated with the Kaplan-Meier estimator,
+        which takes the censored trajectories into account.
+
+        Parameters
+        ----------
+        times : array(k)
+            The times.
+
+        Returns
+        -------
+        survival : array(k)
+            The probability that the first passage time is greater
+            than each time.
+
+        """
+        event_times, survival = self._computeKaplanMeier()
+        times = np.asarray(times, dtype=float)
+        index = np.searchsorted(event_times, times, side="right")
+        survival = np.concatenate(([1.0], survival))[index]
+        return survival
+
+    def computeKernelSurvivalFunction(self, times, bandwidth=None):
+        """
+        Compute the kernel smoothed survival function.
+
+        Each jump of the Kaplan-Meier estimator is smoothed with a
+        Gaussian kernel.
+        The mass of the censored trajectories beyond the last event
+        is not smoothed.
+
+        Parameters
+        ----------
+        times : array(k)
+            The times.
+        bandwidth : float, optional
+            The bandwidth of the kernel.
+            If None, the Silverman rule is applied to the uncensored times.
+
+        Returns
+        -------
+        survival : array(k)
+            The probability that the first passage time is greater
+            than each time.
+
+        """
+        import openturns as ot
+
+        event_times, survival = self._computeKaplanMeier()
+        times = np.asarray(times, dtype=float)
+        if len(event_times) == 0:
+            return np.ones(times.shape)
+        if bandwidth is None:
+            uncensored_times = self.hitting_times[~self.censored]
+            sigma = np.std(uncensored_times)
+            if sigma == 0.0:
+                sigma = 1.0
+            bandwidth = 1.06 * sigma * len(uncensored_times) ** (-1.0 / 5.0)
+        # The probability mass at each event time
+        masses = -np.diff(np.concatenate(([1.0], survival)))
+        z = (times.reshape(-1, 1) - event_times.reshape(1, -1)) / bandwidth
+        cdf = np.array(ot.Normal().computeCDF(z.reshape(-1, 1))).reshape(z.shape)
+        survival = 1.0 - cdf @ masses
+        return survival.reshape(times.shape)
@@ -7,6 +7,8 @@ Defines a Markov chain class with a given number of transitions.
 
 import openturns as ot
 import otmarkov
+import numpy as np
+import asyncio
 
 
 class MarkovChain:
@@ -24,18 +26,26 @@ class MarkovChain:
             The distribution of the state
         number_of_steps : int
             The number of steps within the chain
-        initial_state : float
+        initial_state : ot.Point(d)
             The value of the initial state
         """
         # Check dimension of the state
+        initial_state = ot.Point(initial_state)
         parameter_dimension = step_function.getParameterDimension()
         state_dimension = initial_state.getDimension()
         if parameter_dimension != state_dimension:
             raise ValueError(
-                "The parameter dimension of the step function is %d"
+                "The parameter dimension of the step function is %d "
                 "but the dimension of the state is %d"
                 % (parameter_dimension, state_dimension)
             )
+        output_dimension = step_function.getOutputDimension()
+        if output_dimension != state_dimension:
+            raise ValueError(
+                "The output dimension of the step function is %d "
+                "but the dimension of the state is %d"
+                % (output_dimension, state_dimension)
+            )
         #
         self.step_function = step_function
         self.distribution = distribution
@@ -45,11 +55,76 @@ class MarkovChain:
         self.input_step_dimension = self.distribution.getDimension()
         # Créée la fonction pour la chaîne
         self.aggregated_dimension = self.input_step_dimension * self.number_of_steps
-        # Aggregate the random inputs for all states by repetition.
-        list_of_distributions = [self.distribution] * self.number_of_steps
-        self.aggregated_distribution = ot.BlockIndependentDistribution(
-            list_of_distributions
+        # Evaluate the step function on samples
+        self.batch_step_function = otmarkov.BatchStepFunction(self.step_function)
+        # The aggregated distribution and function are created on demand
+        self.aggregated_distribution = None
+        self.function = None
+        # The state matrix is computed on demand
+        self.state_matrix = None
+        self.is_affine = None
+        return None
+
+    def __reduce__(self):
+        """
+        Return the definition of the chain for pickle.
+
+        Only the arguments of the constructor are serialized: the
+        aggregated function and distribution are created again on demand.
+        """
+        arguments = (
+            self.step_function,
+            self.distribution,
+            self.number_of_steps,
+            np.array(self.initial_state),
         )
+        return (self.__class__, arguments)
+
+    def isSymbolic(self):
+        """
+        Return True if the step function is symbolic.
+
+        The step function is symbolic if it is a ot.ParametricFunction
+        built on top of a ot.SymbolicFunction, where each output is
+        defined by its own formula.
+        In this case, the aggregated function can be evaluated
+        by OpenTURNS without calling the Python interpreter.
+
+        Returns
+        -------
+        is_symbolic : bool
+            True if the step function is symbolic.
+
+        """
+        evaluation = self.step_function.getEvaluation().getImplementation()
+        if not isinstance(evaluation, ot.ParametricEvaluation):
+            return False
+        full_function = evaluation.getFunction()
+        full_evaluation = full_function.getEvaluation().getImplementation()
+        if not isinstance(full_evaluation, ot.SymbolicEvaluation):
+            return False
+        # A single formula which assigns the outputs is not supported
+        formulas = full_evaluation.getFormulas()
+        if formulas.getSize() != full_function.getOutputDimension():
+            return False
+        for formula in formulas:
+            if ":=" in formula:
+                return False
+        return True
+
+    def buildPythonAggregatedFunction(self):
+        """
+        Return the Python function for all steps.
+
+        When the function is evaluated on a ot.Sample, the states
+        are updated step by step for all points at once.
+
+        Returns
+        -------
+        function: ot.PythonFunction
+            The model for all steps.
+
+        """
 
         def myChainFunction(X):
             X = ot.Point(X)
@@ -65,28 +140,342 @@ class MarkovChain:
                 state = self.step_function(Xn)
             return state
 
-        aggregated_dimension = self.aggregated_distribution.getDimension()
-        self.function = ot.PythonFunction(aggregated_dimension, 1, myChainFunction)
+        function = ot.PythonFunction(
+            self.aggregated_dimension,
+            self.getStateDimension(),
+            myChainFunction,
+            self.computeFinalStates,
+        )
         output_description = self.step_function.getOutputDescription()
-        self.function.setOutputDescription(output_description)
-        return None
+        function.setOutputDescription(output_description)
+        return function
+
+    def buildSymbolicAggregatedFunction(self):
+        """
+        Return the symbolic function for all steps.
+
+        The formulas of the step function are unrolled over the steps
+        into a single ExprTk program.
+        At each step, the variables of the step function are updated
+        from the aggregated input and the current state, then
+        the new state is computed from the formulas.
+        Hence, the number of operations is linear with respect to the
+        number of steps.
+
+        Returns
+        -------
+        function: ot.SymbolicFunction
+            The model for all steps.
+
+        """
+        evaluation = self.step_function.getEvaluation().getImplementation()
+        input_positions = evaluation.getInputPositions()
+        parameter_positions = evaluation.getParametersPositions()
+        full_evaluation = evaluation.getFunction().getEvaluation().getImplementation()
+        variables = list(full_evaluation.getInputVariablesNames())
+        formulas = list(full_evaluation.getFormulas())
+        output_dimension = len(formulas)
+
+        # Create names which do not conflict with the step variables
+        def create_names(prefix, number_of_names):
+            while any(name.startswith(prefix) for name in variables):
+                prefix = prefix + "_"
+            return ["%s%d" % (prefix, i) for i in range(number_of_names)]
+
+        aggregated_variables = create_names("x", self.aggregated_dimension)
+        temporary_variables = create_names("t", output_dimension)
+        output_variables = create_names("y", output_dimension)
+        # Declare the step variables
+        statements = []
+        for name in variables + temporary_variables:
+            statements.append("var %s := 0;" % (name))
+        for j in range(output_dimension):
+            name = variables[parameter_positions[j]]
+            statements.append("%s := %r;" % (name, float(self.initial_state[j])))
+        # Unroll the steps
+        for i in range(self.number_of_steps):
+            for j in range(self.input_step_dimension):
+                name = variables[input_positions[j]]
+                index = i * self.input_step_dimension + j
+                statements.append("%s := %s;" % (name, aggregated_variables[index]))
+            for j in range(output_dimension):
+                statements.append("%s := %s;" % (temporary_variables[j], formulas[j]))
+            for j in range(output_dimension):
+                name = variables[parameter_positions[j]]
+                statements.append("%s := %s;" % (name, temporary_variables[j]))
+        for j in range(output_dimension):
+            name = variables[parameter_positions[j]]
+            statements.append("%s := %s;" % (output_variables[j], name))
+        function = ot.SymbolicFunction(
+            aggregated_variables, output_variables, " ".join(statements)
+        )
+        function.setOutputDescription(self.step_function.getOutputDescription())
+        return function
+
+    def computeFinalStates(self, input_sample):
+        """
+        Compute the final states from a sample of aggregated inputs.
+
+        The steps are performed for all points of the sample at once:
+        at each step, the step function is evaluated on the sample of
+        current states.
+
+        Parameters
+        ----------
+        input_sample : ot.Sample(n, number_of_steps * input_dimension)
+            The aggregated random inputs.
+
+        Returns
+        -------
+        final_states : array(n, d)
+            The states after all steps.
+
+        """
+        input_sample = np.asarray(input_sample, dtype=float)
+        size = input_sample.shape[0]
+        states = np.tile(np.asarray(self.initial_state, dtype=float), (size, 1))
+        for i in range(self.number_of_steps):
+            # Get the random input for this step
+            index_start = i * self.input_step_dimension
+            index_stop = (i + 1) * self.input_step_dimension
+            Xn = input_sample[:, index_start:index_stop]
+            # Compute and update the states
+            states = self.batch_step_function(states, Xn)
+        return states
+
+    def getFinalStateSample(self, size):
+        """
+        Return a sample of the final state.
+
+        The trajectories are simulated all at once: at each step,
+        the random inputs of all trajectories are sampled from the
+        distribution and the step function is evaluated on the sample
+        of current states.
+        Only the current states are stored, not the aggregated input.
+
+        Parameters
+        ----------
+        size : int
+            The sample size.
+
+        Returns
+        -------
+        final_states : array(size, d)
+            The states after all steps.
+
+        """
+        states = np.tile(np.asarray(self.initial_state, dtype=float), (size, 1))
+        states, steps = self.advanceStates(states)
+        return states
+
+    def advanceStates(self, states, steps=None, number_of_steps=None):
+        """
+        Advance a sample of trajectories from their current states.
+
+        Each trajectory has its own step counter, i.e. the number of steps
+        already performed since the initial state.
+        The trajectories are advanced all at once, as in
+        getFinalStateSample(), but never beyond the number of steps of
+        the chain.
+        Hence, a population of trajectories can be continued from
+        intermediate states, e.g. the states returned by a previous call,
+        without simulating the first steps again.
+
+        Parameters
+        ----------
+        states : array(n, d) or ot.Sample(n, d)
+            The current states.
+        steps : array(n) of int, optional
+            The number of steps already performed by each trajectory.
+            If None, the states are initial states.
+        number_of_steps : int, optional
+            The number of steps to perform.
+            If None, the trajectories are advanced up to the final step.
+
+        Returns
+        -------
+        states : array(n, d)
+            The new states.
+        steps : array(n) of int
+            The new step counters.
+
+        """
+        states = np.array(states, dtype=float)
+        size = states.shape[0]
+        if states.shape != (size, self.getStateDimension()):
+            raise ValueError(
+                "The states have shape %s, but must be (n, %d)"
+                % (states.shape, self.getStateDimension())
+            )
+        if steps is None:
+            steps = np.zeros(size, dtype=int)
+        steps = np.array(steps, dtype=int)
+        if steps.shape != (size,):
+            raise ValueError(
+                "The number of step counters is %d, but must be %d" % (len(steps), size)
+            )
+        if np.any(steps < 0) or np.any(steps > self.number_of_steps):
+            raise ValueError(
+                "The step counters must be in [0, %d]" % (self.number_of_steps)
+            )
+        if number_of_steps is None:
+            target_steps = np.full(size, self.number_of_steps)
+        else:
+            target_steps = np.minimum(steps + number_of_steps, self.number_of_steps)
+        # The indices of the trajectories which are advanced
+        active = np.flatnonzero(steps < target_steps)
+        while len(active) > 0:
+            Xn = self.distribution.getSample(len(active))
+            states[active] = self.batch_step_function(states[active], Xn)
+            steps[active] += 1
+            active = active[steps[active] < target_steps[active]]
+        return states, steps
+
+    def getHistorySample(self, size):
+        """
+        Return a sample of trajectories.
+
+        The trajectories are simulated all at once, as in
+        getFinalStateSample(), and the states are stored at each step.
+
+        Parameters
+        ----------
+        size : int
+            The sample size.
+
+        Returns
+        -------
+        histories : array(size, number_of_steps + 1, d)
+            The states of each trajectory, from the initial state
+            to the final state.
+
+        """
+        state_dimension = self.getStateDimension()
+        histories = np.empty((size, self.number_of_steps + 1, state_dimension))
+        histories[:, 0] = np.asarray(self.initial_state, dtype=float)
+        for i in range(self.number_of_steps):
+            Xn = self.distribution.getSample(size)
+            histories[:, i + 1] = self.batch_step_function(histories[:, i], Xn)
+        return histories
+
+    def getAggregatedInputSample(self, size):
+        """
+        Return a sample of the aggregated input.
+
+        The random inputs are sampled step by step from the distribution
+        of the step, which is faster than sampling from the
+        aggregated distribution when the number of steps is large.
+
+        Parameters
+        ----------
+        size : int
+            The sample size.
+
+        Returns
+        -------
+        input_sample : array(size, number_of_steps * input_dimension)
+            The aggregated random inputs.
+
+        """
+        input_sample = np.empty((size, self.aggregated_dimension))
+        for i in range(self.number_of_steps):
+            index_start = i * self.input_step_dimension
+            index_stop = (i + 1) * self.input_step_dimension
+            input_sample[:, index_start:index_stop] = self.distribution.getSample(size)
+        return input_sample
+
+    def isAffine(self, size=10, rtol=1.0e-8):
+        """
+        Return True if the step is affine with respect to the state.
+
+        The step is affine if:
+
+            state_{n+1} = A state_n + g(X_n)
+
+        where A is a matrix which does not depend on X_n.
+        This is checked numerically: the columns of A are computed by
+        finite differences on a sample of random inputs and the
+        affine model is checked at a random state.
+
+        Parameters
+        ----------
+        size : int
+            The number of random inputs used for the check.
+        rtol : float
+            The relative tolerance of the check.
+
+        Returns
+        -------
+        is_affine : bool
+            True if the step is affine.
+
+        """
+        if self.is_affine is not None:
+            return self.is_affine
+        state_dimension = self.getStateDimension()
+        input_sample = np.array(self.distribution.getSample(size))
+        reference_state = np.array(self.initial_state, dtype=float)
+        reference_output = self.batch_step_function(reference_state, input_sample)
+        scale = 1.0 + np.max(np.abs(reference_output))
+        state_matrix = np.empty((reference_output.shape[1], state_dimension))
+        self.is_affine = False
+        for j in range(state_dimension):
+            state = reference_state.copy()
+            state[j] += 1.0
+            output = self.batch_step_function(state, input_sample)
+            columns = output - reference_output
+            if not np.allclose(columns, columns[0], rtol=0.0, atol=rtol * scale):
+                return False
+            state_matrix[:, j] = columns[0]
+        # Check the affine model at a random state
+        state = reference_state + np.array(ot.Normal(state_dimension).getRealization())
+        output = self.batch_step_function(state, input_sample)
+        prediction = reference_output + state_matrix @ (state - reference_state)
+        if not np.allclose(output, prediction, rtol=0.0, atol=rtol * scale):
+            return False
+        self.is_affine = True
+        self.state_matrix = ot.Matrix(state_matrix)
+        return True
+
+    def getStateMatrix(self):
+        """
+        Return the matrix of the affine step.
+
+        Returns
+        -------
+        state_matrix : ot.Matrix(d, d)
+            The matrix A such that state_{n+1} = A state_n + g(X_n).
+
+        """
+        if not self.isAffine():
+            raise ValueError("The step is not affine with respect to the state")
+        return self.state_matrix
 
     def getAggregatedDistribution(self):
         """
         Return the aggregated input distribution.
 
+        The distribution is created on the first call.
+
         Returns
         -------
         aggregated_distribution : ot.Distribution
             The distribution of the random state, for all steps.
 
         """
+        if self.aggregated_distribution is None:
+            # Aggregate the random inputs for all states by repetition.
+            list_of_distributions = [self.distribution] * self.number_of_steps
+            self.aggregated_distribution = ot.BlockIndependentDistribution(
+                list_of_distributions
+            )
         return self.aggregated_distribution
 
     def getAggregatedFunction(self):
         """
         Return the function for all steps.
 
+        The function is created on the first call.
         This function takes the agglomerated random vector as input
         and returns the new state as output.
         Its parameters are the successive values of the state.
@@ -96,10 +485,17 @@ class MarkovChain:
 
         Returns
         -------
-        function: ot.PythonFunction
+        function: ot.Function
             The model for all steps.
+            If the step function is symbolic, this is a ot.SymbolicFunction.
+            Otherwise, this is a ot.PythonFunction.
 
         """
+        if self.function is None:
+            if self.isSymbolic():
+                self.function = self.buildSymbolicAggregatedFunction()
+            else:
+                self.function = self.buildPythonAggregatedFunction()
         return self.function
 
     def getCompositeRandomVector(self):
@@ -112,18 +508,18 @@ class MarkovChain:
             The random vector which the output of the Markov chain.
 
         """
-        myInputRV = ot.RandomVector(self.aggregated_distribution)
-        myOutputRV = ot.CompositeRandomVector(self.function, myInputRV)
+        myInputRV = ot.RandomVector(self.getAggregatedDistribution())
+        myOutputRV = ot.CompositeRandomVector(self.getAggregatedFunction(), myInputRV)
         return myOutputRV
 
     def getStateDimension(self):
         """
-        Return the input distribution.
+        Return the dimension of the state.
 
         Returns
         -------
-        aggregated_distribution : ot.Distribution
-            The distribution of the random state, for all steps.
+        state_dimension : int
+            The dimension of the state.
 
         """
         return self.initial_state.getDimension()
@@ -146,3 +542,52 @@ class MarkovChain:
             history.append(state)
         result = otmarkov.MarkovChainResult(history)
         return result
+
+    async def simulateAsync(self, size, async_step_function=None, concurrency=1):
+        """
+        Simulate trajectories with an asynchronous step.
+
+        The trajectories are simulated by concurrency workers, so that
+        concurrency trajectories are in flight at the same time.
+        When the step of a trajectory awaits, e.g. a call to an external
+        simulation server, another trajectory which is ready is advanced.
+        Hence, the latencies of the steps of different trajectories overlap.
+        The steps within a trajectory are sequential.
+
+        Parameters
+        ----------
+        size : int
+            The number of trajectories.
+        async_step_function : coroutine function, optional
+            The step, as a function async_step_function(state, X) which
+            returns the new state.
+            If None, the step function is evaluated without awaiting.
+        concurrency : int
+            The maximum number of trajectories in flight.
+
+        Returns
+        -------
+        results : list of otmarkov.MarkovChainResult
+            The results of the simulations, in the order of the trajectories.
+        """
+        if async_step_function is None:
+
+            async def async_step_function(state, X):
+                self.step_function.setParameter(state)
+                return self.step_function(X)
+
+        results = [None] * size
+        trajectory_indices = iter(range(size))
+
+        async def worker():
+            for trajectory_index in trajectory_indices:
+                state = self.initial_state
+                history = [state]
+                for i in range(self.number_of_steps):
+                    Xn = self.distribution.getRealization()
+                    state = ot.Point(await async_step_function(state, Xn))
+                    history.append(state)
+                results[trajectory_index] = otmarkov.MarkovChainResult(history)
+
+        await asyncio.gather(*[worker() for i in range(min(concurrency, size))])
+        return results
@@ -10,15 +10,34 @@ la chaîne.
 
 import openturns as ot
 import otmarkov
+import numpy as np
 
 
 class MarkovChainRandomVector(ot.PythonRandomVector):
     """Create a Markov chain random vector."""
 
-    def __init__(self, step_function, distribution, number_of_steps, initial_state):
+    def __init__(
+        self,
+        step_function,
+        distribution,
+        number_of_steps,
+        initial_state,
+        state_matrix=None,
+        moment_sample_size=10000,
+    ):
         """
         Create a Markov chain random vector.
 
+        If the state matrix A is given, the step is assumed to be affine
+        with respect to the state:
+
+            state_{n+1} = A state_n + g(X_n)
+
+        where g(X) is the output of the step function when the state is zero.
+        In this case, the mean and the covariance of the final state are
+        propagated through the steps from the mean and covariance of g(X),
+        which are estimated from a sample of a single step.
+
         Parameters
         ----------
         step_function : function
@@ -29,24 +48,164 @@ class MarkovChainRandomVector(ot.PythonRandomVector):
             The number of steps within the chain
         initial_state : float
             The value of the initial state
+        state_matrix : ot.Matrix(d, d), optional
+            The matrix of the affine step.
+            If None, the step is not assumed to be affine.
+        moment_sample_size : int
+            The sample size used to estimate the mean and covariance.
         """
         self.markov_chain = otmarkov.MarkovChain(
             step_function, distribution, number_of_steps, initial_state
         )
-        self.randomvector = self.markov_chain.getCompositeRandomVector()
+        if state_matrix is not None:
+            state_matrix = np.array(state_matrix, dtype=float)
+        self.state_matrix = state_matrix
+        self.moment_sample_size = moment_sample_size
+        # The composite random vector and the moments are created on demand
+        self.randomvector = None
+        self.mean = None
+        self.covariance = None
         state_dimension = self.markov_chain.getStateDimension()
         super(MarkovChainRandomVector, self).__init__(state_dimension)
         return None
 
+    def __reduce__(self):
+        """
+        Return the definition of the random vector for pickle.
+
+        The moments are estimated again on demand.
+        """
+        arguments = (
+            self.markov_chain.step_function,
+            self.markov_chain.distribution,
+            self.markov_chain.number_of_steps,
+            np.array(self.markov_chain.initial_state),
+            self.state_matrix,
+            self.moment_sample_size,
+        )
+        return (self.__class__, arguments)
+
     def getRealization(self):
         """
         Generate a random realization of the chain.
 
+        The random inputs are sampled step by step, then the
+        steps of the chain are performed.
+
         Returns
         -------
         realization: ot.Point(d)
             The output of the Markov chain after all steps.
 
         """
-        X = self.randomvector.getRealization()
+        final_states = self.markov_chain.getFinalStateSample(1)
+        X = ot.Point(final_states[0])
         return X
+
+    def getSample(self, size):
+        """
+        Generate a sample of the chain.
+
+        All the trajectories are simulated at once: at each step,
+        a sample of random inputs is generated and the step
+        function is evaluated on the sample of current states.
+
+        Parameters
+        ----------
+        size : int
+            The sample size.
+
+        Returns
+        -------
+        sample: array(size, d)
+            The outputs of the Markov chain after all steps.
+            An array is returned because its conversion within
+            ot.RandomVector is much faster than the one of a ot.Sample.
+
+        """
+        sample = self.markov_chain.getFinalStateSample(size)
+        return sample
+
+    def computeMoments(self):
+        """
+        Compute the mean and the covariance of the final state.
+
+        If the step is affine, the moments are propagated through the steps:
+
+            m_{n+1} = A m_n + mu
+            C_{n+1} = A C_n A^T + Sigma
+
+        where mu and Sigma are the mean and covariance of g(X).
+        Otherwise, they are estimated from a sample of the final state.
+
+        Returns
+        -------
+        None.
+
+        """
+        if self.state_matrix is None:
+            sample = self.markov_chain.getFinalStateSample(self.moment_sample_size)
+            self.mean = np.mean(sample, axis=0)
+            self.covariance = np.atleast_2d(np.cov(sample, rowvar=False))
+            return None
+        state_dimension = self.markov_chain.getStateDimension()
+        # Sample the affine part of the step
+        zero_state = np.zeros(state_dimension)
+        input_sample = self.markov_chain.distribution.getSample(self.moment_sample_size)
+        g_sample = self.markov_chain.batch_step_function(zero_state, input_sample)
+        mu = np.mean(g_sample, axis=0)
+        sigma = np.atleast_2d(np.cov(g_sample, rowvar=False))
+        # Propagate the moments
+        A = self.state_matrix
+        mean = np.array(self.markov_chain.initial_state, dtype=float)
+        covariance = np.zeros((state_dimension, state_dimension))
+        for i in range(self.markov_chain.number_of_steps):
+            mean = A @ mean + mu
+            covariance = A @ covariance @ A.T + sigma
+        self.mean = mean
+        self.covariance = covariance
+        return None
+
+    def getMean(self):
+        """
+        Return the mean of the final state.
+
+        Returns
+        -------
+        mean: ot.Point(d)
+            The mean of the Markov chain after all steps.
+
+        """
+        if self.mean is None:
+            self.computeMoments()
+        return ot.Point(self.mean)
+
+    def getCovariance(self):
+        """
+        Return the covariance of the final state.
+
+        Returns
+        -------
+        covariance: ot.CovarianceMatrix(d)
+            The covariance of the Markov chain after all steps.
+
+        """
+        if self.covariance is None:
+            self.computeMoments()
+        return ot.CovarianceMatrix(self.covariance)
+
+    def getCompositeRandomVector(self):
+        """
+        Return the output random vector.
+
+        The random vector is created on the first call.
+
+        Returns
+        -------
+        randomvector : ot.CompositeRandomVector
+            The random vector which the output of the Markov chain.
+
+        """
+        if self.randomvector is None:
+            self.randomvector = self.markov_chain.getCompositeRandomVector()
+        return self.randomvector
@@ -3,6 +3,8 @@
 A class to define a Markov chain result.
 """
 
+import numpy as np
+
 
 class MarkovChainResult:
     """The result of a Markov chain simulation."""
@@ -11,9 +13,14 @@ class MarkovChainResult:
         """
         Create the result of a MarkovChain simulation.
 
+        The result is serialized as an array of states, so that pickling
+        a result does not pickle one OpenTURNS object per state.
+        With the pickle protocol 5, the buffer of the array can be
+        transferred out-of-band.
+
         Parameters
         ----------
-        history : list of ot.Point(d)
+        history : list of ot.Point(d) or array(number_of_steps + 1, d)
             The sequence of states in the simulation.
 
         Returns
@@ -21,7 +28,60 @@ class MarkovChainResult:
         None.
 
         """
-        self.history = history
+        if isinstance(history, np.ndarray):
+            # The list of points is created on demand
+            self.history = None
+            self.states = np.ascontiguousarray(history, dtype=float)
+        else:
+            # The array of states is created on demand
+            self.history = history
+            self.states = None
+
+    def __getstate__(self):
+        """Return the state of the result for pickle."""
+        return {"states": self.getStates()}
+
+    def __setstate__(self, state):
+        """Set the state of the result from pickle."""
+        self.history = None
+        self.states = state["states"]
+
+    def save(self, filename):
+        """
+        Save the result to a .npz file.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file.
+
+        Returns
+        -------
+        None.
+
+        """
+        np.savez(filename, states=self.getStates())
+        return None
+
+    @staticmethod
+    def load(filename):
+        """
+        Load a result from a .npz file.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file.
+
+        Returns
+        -------
+        result : otmarkov.MarkovChainResult
+            The result.
+
+        """
+        with np.load(filename) as data:
+            result = MarkovChainResult(data["states"])
+        return result
 
     def getInitialState(self):
         """
@@ -33,7 +93,7 @@ class MarkovChainResult:
             The initial state.
 
         """
-        return self.history[0]
+        return self.getHistory()[0]
 
     def getFinalState(self):
         """
@@ -45,7 +105,7 @@ class MarkovChainResult:
             The final state.
 
         """
-        return self.history[-1]
+        return self.getHistory()[-1]
 
     def getNumberOfSteps(self):
         """
@@ -59,7 +119,10 @@ class MarkovChainResult:
             The number of steps.
 
         """
-        number_of_steps = len(self.history) - 1
+        if self.history is None:
+            number_of_steps = self.states.shape[0] - 1
+        else:
+            number_of_steps = len(self.history) - 1
         return number_of_steps
 
     def getHistory(self):
@@ -72,4 +135,23 @@ class MarkovChainResult:
             The sequence of states.
 
         """
+        if self.history is None:
+            import openturns as ot
+
+            self.history = list(ot.Sample(self.states))
         return self.history
+
+    def getStates(self):
+        """
+        Return the sequence of states in the chain as an array.
+
+        Returns
+        -------
+        states : array(number_of_steps + 1, d)
+            The sequence of states.
+
+        """
+        if self.states is None:
+            states = np.array(self.history, dtype=float)
+            self.states = states.reshape(len(self.history), -1)
+        return self.states
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Michaël Baudin
+
+Defines the sensitivity analysis of a Markov chain with Sobol' indices.
+"""
+
+import openturns as ot
+import numpy as np
+
+
+class MarkovChainSensitivityAnalysis:
+    """Estimate the Sobol' indices of the random inputs of a Markov chain."""
+
+    def __init__(self, markov_chain, size, estimator="Saltelli", block_size=1000):
+        """
+        Create a new sensitivity analysis of a Markov chain.
+
+        The inputs of the chain are the random inputs of all steps.
+        Three families of indices are estimated:
+
+        * the indices of each aggregated input,
+        * the indices of each input variable, grouped across all steps,
+        * the indices of each step, grouped across all input variables.
+
+        The indices of a group of inputs are the closed Sobol' indices
+        of the group.
+        The estimation is based on the pick-freeze method: two independent
+        samples A and B are generated and, for each group, the hybrid sample
+        is A where the columns of the group are taken from B.
+        The samples are processed by blocks and only the sums required by the
+        estimators are kept, so that the full design is never stored.
+
+        Parameters
+        ----------
+        markov_chain : otmarkov.MarkovChain
+            The Markov chain.
+        size : int
+            The size of the samples A and B.
+        estimator : str
+            The estimator, "Saltelli" or "Martinez".
+        block_size : int
+            The number of points of A and B which are processed at once.
+        """
+        if estimator not in ["Saltelli", "Martinez"]:
+            raise ValueError(
+                "The estimator must be Saltelli or Martinez, but is %s" % (estimator)
+            )
+        self.markov_chain = markov_chain
+        self.size = size
+        self.estimator = estimator
+        self.block_size = block_size
+        number_of_steps = markov_chain.number_of_steps
+        input_step_dimension = markov_chain.input_step_dimension
+        # Each aggregated input
+        groups = [[i] for i in range(markov_chain.aggregated_dimension)]
+        # Each input variable, across steps
+        for j in range(input_step_dimension):
+            groups.append(
+                [i * input_step_dimension + j for i in range(number_of_steps)]
+            )
+        # Each step, across input variables
+        for i in range(number_of_steps):
+            groups.append(
+                [i * input_step_dimension + j for j in range(input_step_dimension)]
+            )
+        self.groups = groups
+        self.first_order_indices = None
+        self.total_order_indices = None
+        return None
+
+    def getNumberOfEvaluations(self):
+        """
+        Return the number of evaluations of the chain.
+
+        Returns
+        -------
+        number_of_evaluations : int
+            The number of evaluations of the chain required by the analysis.
+
+        """
+        number_of_evaluations = (len(self.groups) + 2) * self.size
+        return number_of_evaluations
+
+    def run(self):
+        """
+        Estimate the indices.
+
+        Returns
+        -------
+        None.
+
+        """
+        number_of_groups = len(self.groups)
+        shift = None
+        # Sums of the outputs of A and B
+        sum_A = 0.0
+        sum_B = 0.0
+        sum_AA = 0.0
+        sum_BB = 0.0
+        sum_AB = 0.0
+        # Sums involving the outputs of the hybrid samples
+        sum_C = [0.0] * number_of_groups
+        sum_CC = [0.0] * number_of_groups
+        sum_AC = [0.0] * number_of_groups
+        sum_BC = [0.0] * number_of_groups
+        number_of_blocks = (self.size + self.block_size - 1) // self.block_size
+        for block_index in range(number_of_blocks):
+            block_size = min(self.block_size, self.size - block_index * self.block_size)
+            sample_A = self.markov_chain.getAggregatedInputSample(block_size)
+            sample_B = self.markov_chain.getAggregatedInputSample(block_size)
+            output_A = self.markov_chain.computeFinalStates(sample_A)
+            output_B = self.markov_chain.computeFinalStates(sample_B)
+            if shift is None:
+                # Center the outputs to reduce the round-off errors
+                shift = np.mean(output_A, axis=0)
+            output_A = output_A - shift
+            output_B = output_B - shift
+            sum_A += np.sum(output_A, axis=0)
+            sum_B += np.sum(output_B, axis=0)
+            sum_AA += np.sum(output_A**2, axis=0)
+            sum_BB += np.sum(output_B**2, axis=0)
+            sum_AB += np.sum(output_A * output_B, axis=0)
+            for k, group in enumerate(self.groups):
+                sample_C = sample_A.copy()
+                sample_C[:, group] = sample_B[:, group]
+                output_C = self.markov_chain.computeFinalStates(sample_C) - shift
+                sum_C[k] += np.sum(output_C, axis=0)
+                sum_CC[k] += np.sum(output_C**2, axis=0)
+                sum_AC[k] += np.sum(output_A * output_C, axis=0)
+                sum_BC[k] += np.sum(output_B * output_C, axis=0)
+        size = self.size
+        mean_A = sum_A / size
+        mean_B = sum_B / size
+        mean_C = np.array(sum_C) / size
+        if self.estimator == "Saltelli":
+            # Variance of the pooled outputs of A and B
+            mean = (sum_A + sum_B) / (2 * size)
+            variance = (sum_AA + sum_BB) / (2 * size) - mean**2
+            first_order = (np.array(sum_BC) - sum_AB) / size / variance
+            total_order = (
+                (sum_AA - 2.0 * np.array(sum_AC) + np.array(sum_CC)) / (2 * size)
+            ) / variance
+        else:
+            # Correlation coefficients
+            std_A = np.sqrt(sum_AA / size - mean_A**2)
+            std_B = np.sqrt(sum_BB / size - mean_B**2)
+            std_C = np.sqrt(np.array(sum_CC) / size - mean_C**2)
+            covariance_BC = np.array(sum_BC) / size - mean_B * mean_C
+            covariance_AC = np.array(sum_AC) / size - mean_A * mean_C
+            first_order = covariance_BC / (std_B * std_C)
+            total_order = 1.0 - covariance_AC / (std_A * std_C)
+        self.first_order_indices = first_order
+        self.total_order_indices = total_order
+        return None
+
+    def _getIndices(self, indices, marginal_index, start, stop):
+        """Return the indices of the groups in [start, stop)."""
+        if indices is None:
+            raise ValueError("The indices are not estimated: run() must be called")
+        return ot.Point(indices[start:stop, marginal_index])
+
+    def getFirstOrderIndices(self, marginal_index=0):
+        """
+        Return the first order indices of the aggregated inputs.
+
+        Parameters
+        ----------
+        marginal_index : int
+            The index of the component of the state.
+
+        Returns
+        -------
+        indices : ot.Point(number_of_steps * input_dimension)
+            The first order indices of each aggregated input.
+
+        """
+        start = 0
+        stop = self.markov_chain.aggregated_dimension
+        return self._getIndices(self.first_order_indices, marginal_index, start, stop)
+
+    def getTotalOrderIndices(self, marginal_index=0):
+        """
+        Return the total order indices of the aggregated inputs.
+
+        Parameters
+        ----------
+        marginal_index : int
+            The index of the component of the state.
+
+        Returns
+        -------
+        indices : ot.Point(number_of_steps * input_dimension)
+            The total order indices of each aggregated input.
+
+        """
+        start = 0
+        stop = self.markov_chain.aggregated_dimension
+        return self._getIndices(self.total_order_indices, marginal_index, start, stop)
+
+    def getFirstOrderIndicesPerVariable(self, marginal_index=0):
+        """
+        Return the first order indices of each input variable across steps.
+
+        Parameters
+        ----------
+        marginal_index : int
+            The index of the component of the state.
+
+        Returns
+        -------
+        indices : ot.Point(input_dimension)
+            The first order indices of each input variable.
+
+        """
+        start = self.markov_chain.aggregated_dimension
+        stop = start + self.markov_chain.input_step_dimension
+        return self._getIndices(self.first_order_indices, marginal_index, start, stop)
+
+    def getTotalOrderIndicesPerVariable(self, marginal_index=0):
+        """
+        Return the total order indices of each input variable across steps.
+
+        Parameters
+        ----------
+        marginal_index : int
+            The index of the component of the state.
+
+        Returns
+        -------
+        indices : ot.Point(input_dimension)
+            The total order indices of each input variable.
+
+        """
+        start = self.markov_chain.aggregated_dimension
+        stop = start + self.markov_chain.input_step_dimension
+        return self._getIndices(self.total_order_indices, marginal_index, start, stop)
+
+    def getFirstOrderIndicesPerStep(self, marginal_index=0):
+        """
+        Return the first order indices of each step across input variables.
+
+        Parameters
+        ----------
+        marginal_index : int
+            The index of the component of the state.
+
+        Returns
+        -------
+        indices : ot.Point(number_of_steps)
+            The first order indices of each step.
+
+        """
+        start = (
+            self.markov_chain.aggregated_dimension
+            + self.markov_chain.input_step_dimension
+        )
+        stop = len(self.groups)
+        return self._getIndices(self.first_order_indices, marginal_index, start, stop)
+
+    def getTotalOrderIndicesPerStep(self, marginal_index=0):
+        """
+        Return the total order indices of each step across input variables.
+
+        Parameters
+        ----------
+        marginal_index : int
+            The index of the component of the state.
+
+        Returns
+        -------
+        indices : ot.Point(number_of_steps)
+            The total order indices of each step.
+
+        """
+        start = (
+            self.markov_chain.aggregated_dimension
+            + self.markov_chain.input_step_dimension
+        )
+        stop = len(self.groups)
+        return self._getIndices(self.total_order_indices, marginal_index, start, stop)
@@ -6,6 +6,8 @@ Defines a Piecewise Deterministic Markov Process on finite horizon.
 """
 
 import otmarkov
+import numpy as np
+import asyncio
 
 
 class MarkovProcess:
@@ -18,30 +20,118 @@ class MarkovProcess:
         stop_callback,
         maximum_number_of_steps,
         initial_state,
+        stop_sample_callback=None,
     ):
         """
         Create a new Markov process.
 
+        The batched methods, such as getHistorySample(), only require
+        a vectorized step function step_function(states, input_sample) and
+        a distribution which has a getSample(size) method.
+        In this case, OpenTURNS is not imported.
+
         Parameters
         ----------
-        step_function : function
+        step_function : ot.Function or function
             The function which performs the step
         distribution : ot.Distribution
-            The distribution of the state
+            The distribution of the random input of a step
         maximum_number_of_steps : int
             The maximum number of steps in the process.
         stop_callback : function
             The function which evaluates the stoping rule.
-        initial_state : float
+        initial_state : ot.Point(d)
             The value of the initial state
+        stop_sample_callback : function, optional
+            The function which evaluates the stoping rule on an
+            array(n, d) of states and returns an array(n) of booleans.
+            If None, the stop callback is evaluated on each state.
         """
+        # Evaluate the step function on samples
+        batch_step_function = otmarkov.BatchStepFunction(step_function)
+        if batch_step_function.is_vectorized:
+            # The NumPy path does not import OpenTURNS
+            initial_state = np.array(initial_state, dtype=float)
+        else:
+            import openturns as ot
+
+            # Check dimension of the state
+            initial_state = ot.Point(initial_state)
+            parameter_dimension = step_function.getParameterDimension()
+            state_dimension = initial_state.getDimension()
+            if parameter_dimension != state_dimension:
+                raise ValueError(
+                    "The parameter dimension of the step function is %d "
+                    "but the dimension of the state is %d"
+                    % (parameter_dimension, state_dimension)
+                )
+            output_dimension = step_function.getOutputDimension()
+            if output_dimension != state_dimension:
+                raise ValueError(
+                    "The output dimension of the step function is %d "
+                    "but the dimension of the state is %d"
+                    % (output_dimension, state_dimension)
+                )
+        #
         self.step_function = step_function
         self.distribution = distribution
         self.stop_callback = stop_callback
         self.maximum_number_of_steps = maximum_number_of_steps
         self.initial_state = initial_state
+        self.stop_sample_callback = stop_sample_callback
+        self.batch_step_function = batch_step_function
         return None
 
+    def __reduce__(self):
+        """
+        Return the definition of the process for pickle.
+
+        Only the arguments of the constructor are serialized.
+        The callbacks must be picklable, e.g. module-level functions.
+        """
+        arguments = (
+            self.step_function,
+            self.distribution,
+            self.stop_callback,
+            self.maximum_number_of_steps,
+            np.array(self.initial_state),
+            self.stop_sample_callback,
+        )
+        return (self.__class__, arguments)
+
+    def getStateDimension(self):
+        """
+        Return the dimension of the state.
+
+        Returns
+        -------
+        state_dimension : int
+            The dimension of the state.
+
+        """
+        return len(self.initial_state)
+
+    def computeStops(self, states):
+        """
+        Evaluate the stoping rule on a sample of states.
+
+        Parameters
+        ----------
+        states : array(n, d)
+            The current states.
+
+        Returns
+        -------
+        must_stop : array(n) of bool
+            True if the corresponding trajectory must stop.
+
+        """
+        if self.stop_sample_callback is not None:
+            must_stop = np.asarray(self.stop_sample_callback(states), dtype=bool)
+            return must_stop.reshape(len(states))
+        must_stop = np.array([bool(self.stop_callback(state)) for state in states])
+        return must_stop.reshape(len(states))
+
     def simulate(self):
         """
         Return a realization of the process.
@@ -65,3 +155,179 @@ class MarkovProcess:
                 break
         result = otmarkov.MarkovChainResult(history)
         return result
+
+    def advanceStates(self, states, steps=None, number_of_steps=None):
+        """
+        Advance a sample of trajectories from their current states.
+
+        Each trajectory has its own step counter, i.e. the number of steps
+        already performed since the initial state.
+        The trajectories which are not stopped are advanced all at once,
+        as in getHistorySample(), but never beyond the maximum number of
+        steps.
+        A trajectory which has performed at least one step is stopped
+        if the stoping rule is satisfied by its state.
+        Hence, a population of trajectories can be continued from
+        intermediate states, e.g. the states returned by a previous call,
+        without simulating the first steps again.
+
+        Parameters
+        ----------
+        states : array(n, d) or ot.Sample(n, d)
+            The current states.
+        steps : array(n) of int, optional
+            The number of steps already performed by each trajectory.
+            If None, the states are initial states.
+        number_of_steps : int, optional
+            The number of steps to perform.
+            If None, the trajectories are advanced until they stop or
+            reach the maximum number of steps.
+
+        Returns
+        -------
+        states : array(n, d)
+            The new states.
+        steps : array(n) of int
+            The new step counters.
+        stopped : array(n) of bool
+            True if the stoping rule is satisfied by the trajectory.
+
+        """
+        states = np.array(states, dtype=float)
+        size = states.shape[0]
+        if states.shape != (size, self.getStateDimension()):
+            raise ValueError(
+                "The states have shape %s, but must be (n, %d)"
+                % (states.shape, self.getStateDimension())
+            )
+        if steps is None:
+            steps = np.zeros(size, dtype=int)
+        steps = np.array(steps, dtype=int)
+        if steps.shape != (size,):
+            raise ValueError(
+                "The number of step counters is %d, but must be %d" % (len(steps), size)
+            )
+        if np.any(steps < 0) or np.any(steps > self.maximum_number_of_steps):
+            raise ValueError(
+                "The step counters must be in [0, %d]" % (self.maximum_number_of_steps)
+            )
+        if number_of_steps is None:
+            target_steps = np.full(size, self.maximum_number_of_steps)
+        else:
+            target_steps = np.minimum(
+                steps + number_of_steps, self.maximum_number_of_steps
+            )
+        stopped = np.zeros(size, dtype=bool)
+        started = np.flatnonzero(steps > 0)
+        if len(started) > 0:
+            stopped[started] = self.computeStops(states[started])
+        # The indices of the trajectories which are advanced
+        active = np.flatnonzero(~stopped & (steps < target_steps))
+        while len(active) > 0:
+            X = self.distribution.getSample(len(active))
+            states[active] = self.batch_step_function(states[active], X)
+            steps[active] += 1
+            must_stop = self.computeStops(states[active])
+            stopped[active[must_stop]] = True
+            active = active[~must_stop]
+            active = active[steps[active] < target_steps[active]]
+        return states, steps, stopped
+
+    def getHistorySample(self, size):
+        """
+        Return a sample of trajectories.
+
+        The trajectories are simulated all at once: at each step, the
+        step function is evaluated on the sample of states of the
+        trajectories which are not stopped.
+
+        Parameters
+        ----------
+        size : int
+            The sample size.
+
+        Returns
+        -------
+        histories : array(size, maximum_number_of_steps + 1, d)
+            The states of each trajectory, from the initial state
+            to the final state.
+            The states after the end of a trajectory are nan.
+        lengths : array(size) of int
+            The number of states of each trajectory, i.e. its
+            number of steps + 1.
+
+        """
+        initial_state = np.asarray(self.initial_state, dtype=float)
+        state_dimension = self.getStateDimension()
+        histories = np.full(
+            (size, self.maximum_number_of_steps + 1, state_dimension), np.nan
+        )
+        histories[:, 0] = initial_state
+        lengths = np.full(size, self.maximum_number_of_steps + 1)
+        # The indices of the trajectories which are not stopped
+        active = np.arange(size)
+        for i in range(self.maximum_number_of_steps):
+            if len(active) == 0:
+                break
+            X = self.distribution.getSample(len(active))
+            states = self.batch_step_function(histories[active, i], X)
+            histories[active, i + 1] = states
+            must_stop = self.computeStops(states)
+            lengths[active[must_stop]] = i + 2
+            active = active[~must_stop]
+        return histories, lengths
+
+    async def simulateAsync(self, size, async_step_function=None, concurrency=1):
+        """
+        Return realizations of the process with an asynchronous step.
+
+        The trajectories are simulated by concurrency workers, so that
+        concurrency trajectories are in flight at the same time.
+        When the step of a trajectory awaits, e.g. a call to an external
+        simulation server, another trajectory which is ready is advanced.
+        Hence, the latencies of the steps of different trajectories overlap.
+        The steps within a trajectory are sequential.
+
+        Parameters
+        ----------
+        size : int
+            The number of trajectories.
+        async_step_function : coroutine function, optional
+            The step, as a function async_step_function(state, X) which
+            returns the new state.
+            If None, the step function is evaluated without awaiting.
+        concurrency : int
+            The maximum number of trajectories in flight.
+
+        Returns
+        -------
+        results : list of otmarkov.MarkovChainResult
+            The results of the process, in the order of the trajectories.
+        """
+        import openturns as ot
+
+        if async_step_function is None:
+
+            async def async_step_function(state, X):
+                self.step_function.setParameter(state)
+                return self.step_function(X)
+
+        results = [None] * size
+        trajectory_indices = iter(range(size))
+
+        async def worker():
+            for trajectory_index in trajectory_indices:
+                state = self.initial_state
+                history = [state]
+                for i in range(self.maximum_number_of_steps):
+                    X = self.distribution.getRealization()
+                    state = ot.Point(await async_step_function(state, X))
+                    history.append(state)
+                    # Shall we stop?
+                    must_stop = self.stop_callback(state)
+                    if must_stop:
+                        break
+                results[trajectory_index] = otmarkov.MarkovChainResult(history)
+
+        await asyncio.gather(*[worker() for i in range(min(concurrency, size))])
+        return results
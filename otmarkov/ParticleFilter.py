@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Michaël Baudin
+
+Defines a bootstrap particle filter on a Markov chain.
+"""
+
+import openturns as ot
+import numpy as np
+import time
+
+
+class ParticleFilter:
+    """Estimate the hidden state of a Markov chain from observations."""
+
+    def __init__(
+        self,
+        markov_chain,
+        log_likelihood,
+        number_of_particles,
+        resampling="Systematic",
+        resampling_threshold=1.0,
+        initial_particles=None,
+    ):
+        """
+        Create a new bootstrap particle filter.
+
+        The transition kernel of the hidden state is the step of the
+        Markov chain.
+        For each observation, the particles are propagated with the step
+        function, all at once, then their weights are multiplied by the
+        likelihood of the observation.
+        When the effective sample size of the weights is too low, the
+        particles are resampled.
+        The observations are processed one at a time with update(), so
+        that the filter can run online.
+
+        Parameters
+        ----------
+        markov_chain : otmarkov.MarkovChain
+            The Markov chain which defines the step of the hidden state.
+        log_likelihood : function
+            The logarithm of the likelihood of an observation, as a function
+            log_likelihood(states, observation) which takes an array(n, d)
+            of states and returns an array(n).
+        number_of_particles : int
+            The number of particles.
+        resampling : str
+            The resampling method, "Systematic" or "Stratified".
+        resampling_threshold : float
+            The particles are resampled when the effective sample size is
+            lower or equal to resampling_threshold * number_of_particles.
+            The default value resamples at each step.
+        initial_particles : array(number_of_particles, d), optional
+            The initial particles.
+            If None, all particles are the initial state of the chain.
+        """
+        if resampling not in ["Systematic", "Stratified"]:
+            raise ValueError(
+                "The resampling must be Systematic or Stratified, but is %s"
+                % (resampling)
+            )
+        if initial_particles is None:
+            initial_state = np.asarray(markov_chain.initial_state, dtype=float)
+            initial_particles = np.tile(initial_state, (number_of_particles, 1))
+        initial_particles = np.array(initial_particles, dtype=float)
+        if initial_particles.shape != (
+            number_of_particles,
+            markov_chain.getStateDimension(),
+        ):
+            raise ValueError(
+                "The initial particles have shape %s, but must be (%d, %d)"
+                % (
+                    initial_particles.shape,
+                    number_of_particles,
+                    markov_chain.getStateDimension(),
+                )
+            )
+        self.markov_chain = markov_chain
+        self.log_likelihood = log_likelihood
+        self.number_of_particles = number_of_particles
+        self.resampling = resampling
+        self.resampling_threshold = resampling_threshold
+        self.particles = initial_particles
+        self.weights = np.full(number_of_particles, 1.0 / number_of_particles)
+        # The history of the filter, for each observation
+        self.mean_history = []
+        self.effective_sample_size_history = []
+        self.resampled_history = []
+        self.time_history = []
+        return None
+
+    def computeEffectiveSampleSize(self):
+        """
+        Compute the effective sample size of the current weights.
+
+        Returns
+        -------
+        effective_sample_size : float
+            The effective sample size 1 / sum(w_i^2), in [1, number_of_particles].
+
+        """
+        return 1.0 / np.sum(self.weights**2)
+
+    def _resample(self):
+        """Return the indices of the resampled particles."""
+        size = self.number_of_particles
+        if self.resampling == "Systematic":
+            uniforms = np.full(size, ot.RandomGenerator.Generate())
+        else:
+            uniforms = np.array(ot.RandomGenerator.Generate(size))
+        positions = (np.arange(size) + uniforms) / size
+        cumulated_weights = np.cumsum(self.weights)
+        indices = np.searchsorted(cumulated_weights, positions, side="right")
+        # Round-off errors in the cumulated weights
+        return np.minimum(indices, size - 1)
+
+    def update(self, observation):
+        """
+        Process a new observation.
+
+        Parameters
+        ----------
+        observation : sequence of float
+            The observation after one step of the chain.
+
+        Returns
+        -------
+        None.
+
+        """
+        start = time.perf_counter()
+        # Propagate the particles
+        input_sample = self.markov_chain.distribution.getSample(
+            self.number_of_particles
+        )
+        self.particles = self.markov_chain.batch_step_function(
+            self.particles, input_sample
+        )
+        # Weight the particles
+        log_weights = np.log(self.weights) + self.log_likelihood(
+            self.particles, observation
+        )
+        maximum = np.max(log_weights)
+        if not np.isfinite(maximum):
+            raise ValueError("The likelihood of the observation is zero")
+        weights = np.exp(log_weights - maximum)
+        self.weights = weights / np.sum(weights)
+        mean = self.weights @ self.particles
+        effective_sample_size = self.computeEffectiveSampleSize()
+        # Resample the particles
+        resampled = (
+            effective_sample_size
+            <= self.resampling_threshold * self.number_of_particles
+        )
+        if resampled:
+            self.particles = self.particles[self._resample()]
+            self.weights = np.full(
+                self.number_of_particles, 1.0 / self.number_of_particles
+            )
+        self.mean_history.append(mean)
+        self.effective_sample_size_history.append(effective_sample_size)
+        self.resampled_history.append(resampled)
+        self.time_history.append(time.perf_counter() - start)
+        return None
+
+    def run(self, observations):
+        """
+        Process a sequence of observations.
+
+        Parameters
+        ----------
+        observations : sequence of sequence of float
+            The observations, one for each step of the chain.
+
+        Returns
+        -------
+        None.
+
+        """
+        for observation in observations:
+            self.update(observation)
+        return None
+
+    def getParticles(self):
+        """
+        Return the current particles.
+
+        Returns
+        -------
+        particles : array(number_of_particles, d)
+            The particles.
+
+        """
+        return self.particles
+
+    def getWeights(self):
+        """
+        Return the current normalized weights.
+
+        Returns
+        -------
+        weights : array(number_of_particles)
+            The weights of the particles.
+
+        """
+        return self.weights
+
+    def getNumberOfSteps(self):
+        """
+        Return the number of processed observations.
+
+        Returns
+        -------
+        number_of_steps : int
+            The number of processed observations.
+
+        """
+        return len(self.mean_history)
+
+    def computeMean(self):
+        """
+        Compute the filtered mean of the current state.
+
+        Returns
+        -------
+        mean : array(d)
+            The weighted mean of the particles.
+
+        """
+        return self.weights @ self.particles
+
+    def computeCovariance(self):
+        """
+        Compute the filtered covariance of the current state.
+
+        Returns
+        -------
+        covariance : array(d, d)
+            The weighted covariance of the particles.
+
+        """
+        deviation = self.particles - self.computeMean()
+        return (deviation * self.weights[:, np.newaxis]).T @ deviation
+
+    def getMeanHistory(self):
+        """
+        Return the filtered mean after each observation.
+
+        The mean is computed before the resampling.
+
+        Returns
+        -------
+        mean_history : array(number_of_steps, d)
+            The filtered mean of the state after each observation.
+
+        """
+        return np.array(self.mean_history)
+
+    def getEffectiveSampleSizeHistory(self):
+        """
+        Return the effective sample size after each observation.
+
+        The effective sample size is computed before the resampling.
+
+        Returns
+        -------
+        effective_sample_size_history : array(number_of_steps)
+            The effective sample size after each observation.
+
+        """
+        return np.array(self.effective_sample_size_history)
+
+    def getResampledHistory(self):
+        """
+        Return the resampling indicators.
+
+        Returns
+        -------
+        resampled_history : array(number_of_steps) of bool
+            True if the particles were resampled after the observation.
+
+        """
+        return np.array(self.resampled_history, dtype=bool)
+
+    def getTimeHistory(self):
+        """
+        Return the wall time of each update.
+
+        Returns
+        -------
+        time_history : array(number_of_steps)
+            The time in seconds to process each observation.
+
+        """
+        return np.array(self.time_history)
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Michaël Baudin
+
+Defines a simulation campaign split into chunks which run on an executor.
+"""
+
+import concurrent.futures
+import threading
+import numpy as np
+
+# The random generator of OpenTURNS is shared by the threads of a process
+_random_generator_lock = threading.Lock()
+
+
+def _simulateChunk(model, method_name, chunk_seed, chunk_size):
+    """Simulate a chunk from its seed."""
+    import openturns as ot
+
+    with _random_generator_lock:
+        ot.RandomGenerator.SetSeed(chunk_seed)
+        result = getattr(model, method_name)(chunk_size)
+    return result
+
+
+def _trySimulateChunk(model, method_name, chunk_seed, chunk_size):
+    """Simulate a chunk and return the exception instead of raising it."""
+    try:
+        return _simulateChunk(model, method_name, chunk_seed, chunk_size), None
+    except Exception as exception:
+        return None, exception
+
+
+class SimulationCampaign:
+    """Sample a Markov chain or process by chunks on an executor."""
+
+    def __init__(
+        self,
+        model,
+        size,
+        chunk_size=1000,
+        seed=0,
+        executor=None,
+        method_name="getFinalStateSample",
+        maximum_number_of_retries=2,
+    ):
+        """
+        Create a new simulation campaign.
+
+        The sample is split into chunks, which are simulated independently
+        with the method of the model, e.g. getFinalStateSample() or
+        getHistorySample().
+        The seed of ot.RandomGenerator is set at the start of each chunk
+        from the seed of the campaign and the index of the chunk.
+        Hence, for a given seed and chunk size, the sample does not depend
+        on the executor or on the order in which the chunks are scheduled.
+        A chunk which fails is submitted again.
+        The chunks are merged in the order of their indices.
+
+        The executor can be any object with a submit(function, *args)
+        method which returns a concurrent.futures.Future, e.g. a
+        concurrent.futures.ProcessPoolExecutor.
+        An object with only a map(function, *iterables) method is also
+        accepted, but the chunks are then returned in order.
+        With a process or distributed executor, the model is pickled,
+        hence its step function, distribution and callbacks must be
+        picklable, e.g. a ot.SymbolicFunction.
+
+        Parameters
+        ----------
+        model : otmarkov.MarkovChain or otmarkov.MarkovProcess
+            The model.
+        size : int
+            The total sample size.
+        chunk_size : int
+            The sample size of each chunk.
+        seed : int
+            The seed of the campaign.
+        executor : executor, optional
+            The executor which simulates the chunks.
+            If None, the chunks are simulated sequentially in the
+            current process.
+        method_name : str
+            The name of the method of the model which returns a sample
+            from its size, e.g. "getFinalStateSample" or "getHistorySample".
+            The method must return an array or a tuple of arrays.
+        maximum_number_of_retries : int
+            The maximum number of times a chunk is submitted again
+            after a failure.
+        """
+        if not hasattr(model, method_name):
+            raise ValueError("The model has no method %s" % (method_name))
+        self.model = model
+        self.size = size
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.executor = executor
+        self.method_name = method_name
+        self.maximum_number_of_retries = maximum_number_of_retries
+        # The retries of the last run
+        self.number_of_retries = 0
+        self.number_of_retries_per_chunk = None
+        return None
+
+    def getNumberOfChunks(self):
+        """
+        Return the number of chunks.
+
+        Returns
+        -------
+        number_of_chunks : int
+            The number of chunks.
+
+        """
+        return (self.size + self.chunk_size - 1) // self.chunk_size
+
+    def getChunkSeed(self, chunk_index):
+        """
+        Return the seed of a chunk.
+
+        The seeds of the chunks are generated with a
+        np.random.SeedSequence, so that the chunks of campaigns with
+        different seeds do not share their seeds.
+
+        Parameters
+        ----------
+        chunk_index : int
+            The index of the chunk.
+
+        Returns
+        -------
+        chunk_seed : int
+            The seed of ot.RandomGenerator for this chunk.
+
+        """
+        seed_sequence = np.random.SeedSequence(self.seed, spawn_key=(chunk_index,))
+        return int(seed_sequence.generate_state(1)[0])
+
+    def _getChunkArguments(self, chunk_index):
+        """Return the arguments of the simulation of a chunk."""
+        chunk_size = min(self.chunk_size, self.size - chunk_index * self.chunk_size)
+        return (
+            self.model,
+            self.method_name,
+            self.getChunkSeed(chunk_index),
+            chunk_size,
+        )
+
+    def _retry(self, chunk_index, exception):
+        """Check that the chunk can be submitted again."""
+        if self.number_of_retries_per_chunk[chunk_index] >= (
+            self.maximum_number_of_retries
+        ):
+            raise exception
+        self.number_of_retries_per_chunk[chunk_index] += 1
+        self.number_of_retries += 1
+        return None
+
+    def iterateChunks(self):
+        """
+        Simulate the chunks and yield them as they finish.
+
+        Returns
+        -------
+        chunks : generator of (int, result)
+            The index and the result of each chunk, in the order in
+            which the chunks finish.
+
+        """
+        number_of_chunks = self.getNumberOfChunks()
+        self.number_of_retries = 0
+        self.number_of_retries_per_chunk = [0] * number_of_chunks
+        if not hasattr(self.executor, "submit"):
+            # Simulate the chunks in order with map
+            if self.executor is None:
+                map_function = map
+            else:
+                map_function = self.executor.map
+            chunk_indices = list(range(number_of_chunks))
+            while len(chunk_indices) > 0:
+                arguments = [self._getChunkArguments(i) for i in chunk_indices]
+                outputs = map_function(_trySimulateChunk, *zip(*arguments))
+                failed_chunk_indices = []
+                for chunk_index, (result, exception) in zip(chunk_indices, outputs):
+                    if exception is None:
+                        yield chunk_index, result
+                    else:
+                        self._retry(chunk_index, exception)
+                        failed_chunk_indices.append(chunk_index)
+                chunk_indices = failed_chunk_indices
+            return
+        futures = {}
+        for chunk_index in range(number_of_chunks):
+            arguments = self._getChunkArguments(chunk_index)
+            future = self.executor.submit(_simulateChunk, *arguments)
+            futures[future] = chunk_index
+        while len(futures) > 0:
+            done, not_done = concurrent.futures.wait(
+                futures, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                chunk_index = futures.pop(future)
+                exception = future.exception()
+                if exception is None:
+                    yield chunk_index, future.result()
+                else:
+                    self._retry(chunk_index, exception)
+                    arguments = self._getChunkArguments(chunk_index)
+                    future = self.executor.submit(_simulateChunk, *arguments)
+                    futures[future] = chunk_index
+        return
+
+    def run(self):
+        """
+        Simulate all chunks and merge them.
+
+        Returns
+        -------
+        result : array or tuple of arrays
+            The merged results of the chunks, in the order of the chunks.
+            The arrays are concatenated along their first axis.
+
+        """
+        results = [None] * self.getNumberOfChunks()
+        for chunk_index, result in self.iterateChunks():
+            results[chunk_index] = result
+        if isinstance(results[0], tuple):
+            merged = tuple(np.concatenate(arrays) for arrays in zip(*results))
+        else:
+            merged = np.concatenate(results)
+        return merged
+
+    def getNumberOfRetries(self):
+        """
+        Return the number of chunks submitted again after a failure.
+
+        Returns
+        -------
+        number_of_retries : int
+            The number of retries of the last run.
+
+        """
+        return self.number_of_retries
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Michaël Baudin
+
+Defines statistics at each step over an ensemble of trajectories.
+"""
+
+import numpy as np
+import warnings
+
+
+class TrajectoryEnsembleStatistics:
+    """Compute statistics of the state at each step over trajectories."""
+
+    def __init__(self, store_values=True):
+        """
+        Create new trajectory ensemble statistics.
+
+        The trajectories are added by chunks.
+        The mean and the variance at each step are updated with the
+        chunks, so that the trajectories do not have to be stored.
+        The quantiles require the values of the states, which are stored
+        only if store_values is True.
+        The trajectories may have different lengths, e.g. when they are
+        produced by a otmarkov.MarkovProcess: in this case, the statistics
+        at each step only take into account the trajectories which
+        reach this step.
+
+        Parameters
+        ----------
+        store_values : bool
+            If True, the states are stored so that the quantiles can be
+            computed.
+        """
+        self.store_values = store_values
+        # The number of trajectories which reach each step
+        self.count = np.zeros(0, dtype=int)
+        self.mean = None
+        # The sum of the squared deviations to the mean
+        self.m2 = None
+        self.chunks = []
+        return None
+
+    def add(self, histories, lengths=None):
+        """
+        Add a chunk of trajectories.
+
+        Parameters
+        ----------
+        histories : array(n, T, d)
+            The states of each trajectory at each step.
+        lengths : array(n) of int, optional
+            The number of valid steps of each trajectory.
+            The values beyond the length of a trajectory are ignored.
+            If None, all the trajectories have length T.
+
+        Returns
+        -------
+        None.
+
+        """
+        histories = np.asarray(histories, dtype=float)
+        if histories.ndim == 2:
+            histories = histories[:, :, np.newaxis]
+        size, length, dimension = histories.shape
+        if lengths is None:
+            lengths = np.full(size, length)
+        lengths = np.asarray(lengths, dtype=int)
+        mask = np.arange(length)[np.newaxis, :] < lengths[:, np.newaxis]
+        # Statistics of the chunk
+        chunk_count = np.sum(mask, axis=0)
+        masked = np.where(mask[:, :, np.newaxis], histories, 0.0)
+        safe_count = np.maximum(chunk_count, 1)[:, np.newaxis]
+        chunk_mean = np.sum(masked, axis=0) / safe_count
+        deviation = np.where(
+            mask[:, :, np.newaxis], histories - chunk_mean[np.newaxis, :, :], 0.0
+        )
+        chunk_m2 = np.sum(deviation**2, axis=0)
+        # Extend the statistics if the chunk has more steps
+        if self.mean is None:
+            self.mean = np.zeros((0, dimension))
+            self.m2 = np.zeros((0, dimension))
+        if self.mean.shape[1] != dimension:
+            raise ValueError(
+                "The dimension of the states is %d, but must be %d"
+                % (dimension, self.mean.shape[1])
+            )
+        number_of_steps = max(length, len(self.count))
+        self.count = self._pad(self.count, number_of_steps)
+        self.mean = self._pad(self.mean, number_of_steps)
+        self.m2 = self._pad(self.m2, number_of_steps)
+        chunk_count = self._pad(chunk_count, number_of_steps)
+        chunk_mean = self._pad(chunk_mean, number_of_steps)
+        chunk_m2 = self._pad(chunk_m2, number_of_steps)
+        # Merge the statistics (Chan et al.)
+        total_count = self.count + chunk_count
+        safe_total = np.maximum(total_count, 1)[:, np.newaxis]
+        delta = chunk_mean - self.mean
+        weight = (chunk_count / safe_total[:, 0])[:, np.newaxis]
+        self.mean = self.mean + delta * weight
+        self.m2 = (
+            self.m2 + chunk_m2 + delta**2 * (self.count * weight[:, 0])[:, np.newaxis]
+        )
+        self.count = total_count
+        if self.store_values:
+            self.chunks.append(np.where(mask[:, :, np.newaxis], histories, np.nan))
+        return None
+
+    def addResults(self, results):
+        """
+        Add a list of simulation results.
+
+        Parameters
+        ----------
+        results : list of otmarkov.MarkovChainResult
+            The results of the simulations.
+
+        Returns
+        -------
+        None.
+
+        """
+        states = [result.getStates() for result in results]
+        lengths = [len(result_states) for result_states in states]
+        dimension = states[0].shape[1]
+        histories = np.full((len(results), max(lengths), dimension), np.nan)
+        for i, result_states in enumerate(states):
+            histories[i, : lengths[i]] = result_states
+        self.add(histories, lengths)
+        return None
+
+    def _pad(self, values, number_of_steps):
+        """Pad the values with zeros up to the number of steps."""
+        padding = [(0, number_of_steps - values.shape[0])] + [(0, 0)] * (
+            values.ndim - 1
+        )
+        return np.pad(values, padding)
+
+    def getCount(self):
+        """
+        Return the number of trajectories which reach each step.
+
+        Returns
+        -------
+        count : array(T) of int
+            The number of trajectories at each step.
+
+        """
+        return self.count
+
+    def computeMean(self):
+        """
+        Compute the mean of the state at each step.
+
+        Returns
+        -------
+        mean : array(T, d)
+            The mean at each step.
+            The mean is nan if no trajectory reaches the step.
+
+        """
+        mean = np.where(self.count[:, np.newaxis] > 0, self.mean, np.nan)
+        return mean
+
+    def computeStandardDeviation(self):
+        """
+        Compute the standard deviation of the state at each step.
+
+        The unbiased estimator of the variance is used.
+        The standard deviation is nan if less than two trajectories
+        reach the step.
+
+        Returns
+        -------
+        standard_deviation : array(T, d)
+            The standard deviation at each step.
+
+        """
+        count = self.count[:, np.newaxis]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = np.where(count > 1, self.m2 / (count - 1), np.nan)
+        return np.sqrt(variance)
+
+    def computeQuantile(self, levels):
+        """
+        Compute quantiles of the state at each step.
+
+        Parameters
+        ----------
+        levels : sequence of float
+            The levels of the quantiles, in [0, 1].
+
+        Returns
+        -------
+        quantiles : array(len(levels), T, d)
+            The quantiles at each step.
+
+        """
+        if not self.store_values:
+            raise ValueError("The states are not stored: the quantiles are unknown")
+        number_of_steps = len(self.count)
+        dimension = self.mean.shape[1]
+        values = np.full(
+            (sum(chunk.shape[0] for chunk in self.chunks), number_of_steps, dimension),
+            np.nan,
+        )
+        start = 0
+        for chunk in self.chunks:
+            stop = start + chunk.shape[0]
+            values[start:stop, : chunk.shape[1]] = chunk
+            start = stop
+        with warnings.catch_warnings():
+            # No trajectory reaches the step
+            warnings.simplefilter("ignore", RuntimeWarning)
+            quantiles = np.nanquantile(values, levels, axis=0)
+        return quantiles
+
+    def computeEnvelope(self, alpha=0.05):
+        """
+        Compute a bilateral envelope of the state at each step.
+
+        Parameters
+        ----------
+        alpha : float
+            The complementary probability of the envelope.
+
+        Returns
+        -------
+        lower : array(T, d)
+            The quantile of level alpha / 2 at each step.
+        upper : array(T, d)
+            The quantile of level 1 - alpha / 2 at each step.
+
+        """
+        quantiles = self.computeQuantile([alpha / 2.0, 1.0 - alpha / 2.0])
+        return quantiles[0], quantiles[1]
@@ -1,13 +1,39 @@
-"""otmarkov module."""
-from .MarkovChain import MarkovChain
-from .MarkovChainRandomVector import MarkovChainRandomVector
-from .MarkovProcess import MarkovProcess
-from .MarkovChainResult import MarkovChainResult
+"""otmarkov module.
+
+The classes are imported on first access (PEP 562), so that importing the
+package does not import OpenTURNS.
+"""
+
+import importlib
 
 __all__ = [
+    "AffineMarkovChain",
+    "BatchStepFunction",
+    "ContinuousTimeMarkovChain",
+    "FirstPassageTimeEstimator",
     "MarkovChain",
     "MarkovChainRandomVector",
     "MarkovProcess",
     "MarkovChainResult",
+    "MarkovChainSensitivityAnalysis",
+    "ParticleFilter",
+    "SimulationCampaign",
+    "TrajectoryEnsembleStatistics",
 ]
 __version__ = "0.1"
+
+
+def __getattr__(name):
+    """Import the class on first access."""
+    if name not in __all__:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    # Each class is defined in the module with the same name
+    module = importlib.import_module("." + name, __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Return the attributes of the module, including the lazy classes."""
+    return sorted(list(globals()) + __all__)
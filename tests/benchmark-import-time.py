@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the time to import otmarkov in a new interpreter.
+
+Each statement is executed in new interpreters and the median wall time
+is printed, e.g. to measure the startup cost of short-lived workers.
+"""
+
+import subprocess
+import sys
+import os
+import time
+import numpy as np
+
+# The directory which contains the otmarkov package
+root_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+number_of_repetitions = 10
+statements = [
+    "pass",
+    "import numpy",
+    "import otmarkov",
+    "import otmarkov; otmarkov.MarkovProcess",
+    "import otmarkov; otmarkov.MarkovChain",
+    "import openturns",
+]
+print("%-45s %10s" % ("Statement", "Time (s)"))
+for statement in statements:
+    elapsed = []
+    for i in range(number_of_repetitions):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, "-c", statement], cwd=root_directory)
+        elapsed.append(time.perf_counter() - start)
+    print("%-45s %10.3f" % (statement, np.median(elapsed)))
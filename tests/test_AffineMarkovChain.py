@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 - 2019 EDF.
+"""
+Test de la classe AffineMarkovChain.
+"""
+
+import openturns as ot
+import unittest
+import otmarkov
+import numpy as np
+
+
+class TestAffineMarkovChain(unittest.TestCase):
+    def test_PQR(self):
+        model = ot.SymbolicFunction(["P", "Q", "R", "state"], ["state + P * Q + R"])
+        initial_state = ot.Point([0.0])
+        indices = [3]
+        step_function = ot.ParametricFunction(model, indices, initial_state)
+        P = ot.Normal()
+        Q = ot.Normal()
+        R = ot.WeibullMin()
+        distribution = ot.ComposedDistribution([P, Q, R])
+        number_of_steps = 4
+        markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, number_of_steps, initial_state
+        )
+
+        # Detect the affine step
+        assert markov_chain.isAffine()
+        state_matrix = markov_chain.getStateMatrix()
+        np.testing.assert_allclose(state_matrix, [[1.0]])
+
+        # The innovation is P * Q + R
+        innovation = P * Q + R
+        affine_chain = otmarkov.AffineMarkovChain(
+            state_matrix, innovation, number_of_steps, initial_state
+        )
+        mean = affine_chain.computeMean()
+        covariance = affine_chain.computeCovariance()
+        np.testing.assert_allclose(mean, [4.0])
+        np.testing.assert_allclose(covariance, [[8.0]])
+        mean_history = affine_chain.computeMeanHistory()
+        np.testing.assert_allclose(mean_history, [[0.0], [1.0], [2.0], [3.0], [4.0]])
+
+        # The exact distribution
+        output_distribution = affine_chain.getOutputDistribution()
+        np.testing.assert_allclose(output_distribution.getMean(), [4.0])
+        np.testing.assert_allclose(
+            output_distribution.getStandardDeviation(), [np.sqrt(8.0)]
+        )
+
+    def test_Dimension2(self):
+        # state_{n+1} = A state_n + X_n
+        model = ot.SymbolicFunction(
+            ["x0", "x1", "s0", "s1"], ["0.5 * s0 + 0.1 * s1 + x0", "0.9 * s1 + x1"]
+        )
+        initial_state = ot.Point([1.0, 2.0])
+        indices = [2, 3]
+        step_function = ot.ParametricFunction(model, indices, initial_state)
+        distribution = ot.ComposedDistribution([ot.Normal(1.0, 2.0), ot.Uniform()])
+        number_of_steps = 10
+        markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, number_of_steps, initial_state
+        )
+        state_matrix = markov_chain.getStateMatrix()
+        np.testing.assert_allclose(state_matrix, [[0.5, 0.1], [0.0, 0.9]])
+        affine_chain = otmarkov.AffineMarkovChain(
+            state_matrix, distribution, number_of_steps, initial_state
+        )
+        assert affine_chain.getStateDimension() == 2
+
+        # Compare with Monte-Carlo
+        ot.RandomGenerator.SetSeed(0)
+        sample = markov_chain.getFinalStateSample(20000)
+        mean = affine_chain.computeMean()
+        covariance = affine_chain.computeCovariance()
+        print("mean=", mean)
+        print("covariance=", covariance)
+        np.testing.assert_allclose(mean, np.mean(sample, axis=0), atol=0.05)
+        np.testing.assert_allclose(covariance, np.cov(sample, rowvar=False), atol=0.1)
+        output_distribution = affine_chain.getOutputDistribution()
+        np.testing.assert_allclose(output_distribution.getMean(), mean)
+        np.testing.assert_allclose(output_distribution.getCovariance(), covariance)
+
+    def test_NotAffine(self):
+        model = ot.SymbolicFunction(["T", "state"], ["state * state + T"])
+        initial_state = ot.Point([1.0])
+        step_function = ot.ParametricFunction(model, [1], initial_state)
+        distribution = ot.ComposedDistribution([ot.Exponential()])
+        markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, 4, initial_state
+        )
+        assert not markov_chain.isAffine()
+        self.assertRaises(ValueError, markov_chain.getStateMatrix)
+        # The matrix does not depend on the random input
+        model = ot.SymbolicFunction(["T", "state"], ["T * state"])
+        step_function = ot.ParametricFunction(model, [1], initial_state)
+        markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, 4, initial_state
+        )
+        assert not markov_chain.isAffine()
+
+
+if __name__ == "__main__":
+    unittest.main()
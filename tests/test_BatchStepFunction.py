@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 - 2019 EDF.
+"""
+Test de la classe BatchStepFunction.
+"""
+
+import openturns as ot
+import unittest
+import otmarkov
+import numpy as np
+
+
+class TestBatchStepFunction(unittest.TestCase):
+    def test_ParametricFunction(self):
+        # The state is the second input of the model
+        model = ot.SymbolicFunction(["state", "T"], ["state + T"])
+        step_function = ot.ParametricFunction(model, [0], [0.0])
+        batch_step_function = otmarkov.BatchStepFunction(step_function)
+        states = np.array([[1.0], [2.0], [3.0]])
+        input_sample = np.array([[10.0], [20.0], [30.0]])
+        new_states = batch_step_function(states, input_sample)
+        np.testing.assert_allclose(new_states, [[11.0], [22.0], [33.0]])
+        # A single state is used for all inputs
+        new_states = batch_step_function([1.0], input_sample)
+        np.testing.assert_allclose(new_states, [[11.0], [21.0], [31.0]])
+        # Empty sample
+        new_states = batch_step_function(states[:0], input_sample[:0])
+        assert new_states.shape == (0, 1)
+
+    def test_Function(self):
+        # A function which is not a ParametricFunction is evaluated pointwise
+        step_function = ot.SymbolicFunction(["T"], ["2.0 * T"])
+        batch_step_function = otmarkov.BatchStepFunction(step_function)
+        assert batch_step_function.full_function is None
+        new_states = batch_step_function(np.zeros((2, 0)), [[1.0], [2.0]])
+        np.testing.assert_allclose(new_states, [[2.0], [4.0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 - 2019 EDF.
+"""
+Test de la classe ContinuousTimeMarkovChain.
+"""
+
+import openturns as ot
+import unittest
+import otmarkov
+import numpy as np
+import pickle
+import tempfile
+import os
+
+
+def compute_exponential(matrix):
+    """Compute the exponential of a diagonalizable matrix."""
+    eigenvalues, eigenvectors = np.linalg.eig(matrix)
+    exponential = eigenvectors @ np.diag(np.exp(eigenvalues))
+    exponential = exponential @ np.linalg.inv(eigenvectors)
+    return np.real(exponential)
+
+
+class TestContinuousTimeMarkovChain(unittest.TestCase):
+    def test_SingleComponent(self):
+        # A component with failure rate lambda and repair rate mu
+        failure_rate = 0.1
+        repair_rate = 1.0
+        generator = [[-failure_rate, failure_rate], [repair_rate, -repair_rate]]
+        chain = otmarkov.ContinuousTimeMarkovChain(generator, 0)
+        assert chain.getNumberOfStates() == 2
+        times = np.linspace(0.0, 20.0, 21)
+        up_states = [0]
+
+        # Availability
+        total_rate = failure_rate + repair_rate
+        availability_exact = (
+            repair_rate + failure_rate * np.exp(-total_rate * times)
+        ) / total_rate
+        availability = chain.computeAvailability(times, up_states)
+        np.testing.assert_allclose(availability, availability_exact, atol=1.0e-10)
+
+        # Reliability
+        reliability_exact = np.exp(-failure_rate * times)
+        reliability = chain.computeReliability(times, up_states)
+        np.testing.assert_allclose(reliability, reliability_exact, atol=1.0e-10)
+
+        # Gillespie simulation
+        ot.RandomGenerator.SetSeed(0)
+        size = 10000
+        states = chain.getStateSample(size, times)
+        assert states.shape == (size, len(times))
+        np.testing.assert_array_equal(states[:, 0], 0)
+        availability = np.mean(states == 0, axis=0)
+        np.testing.assert_allclose(availability, availability_exact, atol=0.02)
+        absorbing_chain = chain.getAbsorbingChain([1])
+        states = absorbing_chain.getStateSample(size, times)
+        reliability = np.mean(states == 0, axis=0)
+        np.testing.assert_allclose(reliability, reliability_exact, atol=0.02)
+
+    def test_ThreeStates(self):
+        # Two redundant components with a single repairer
+        failure_rate = 0.5
+        repair_rate = 2.0
+        generator = np.array(
+            [
+                [-2.0 * failure_rate, 2.0 * failure_rate, 0.0],
+                [repair_rate, -repair_rate - failure_rate, failure_rate],
+                [0.0, repair_rate, -repair_rate],
+            ]
+        )
+        initial_probabilities = [0.5, 0.5, 0.0]
+        chain = otmarkov.ContinuousTimeMarkovChain(generator, initial_probabilities)
+        times = [0.0, 0.1, 1.0, 10.0, 100.0]
+        probabilities = chain.computeTransientProbabilities(times)
+        for i, t in enumerate(times):
+            expected = initial_probabilities @ compute_exponential(generator * t)
+            np.testing.assert_allclose(probabilities[i], expected, atol=1.0e-10)
+        np.testing.assert_allclose(np.sum(probabilities, axis=1), 1.0)
+
+        # Gillespie simulation
+        ot.RandomGenerator.SetSeed(0)
+        states = chain.getStateSample(10000, times[:4])
+        for j in range(3):
+            np.testing.assert_allclose(
+                np.mean(states == j, axis=0), probabilities[:4, j], atol=0.02
+            )
+
+    def test_Serialization(self):
+        generator = [[-1.0, 1.0, 0.0], [2.0, -3.0, 1.0], [0.0, 0.0, 0.0]]
+        chain = otmarkov.ContinuousTimeMarkovChain(generator, [0.5, 0.5, 0.0])
+        times = [0.0, 1.0, 2.0]
+        expected = chain.computeTransientProbabilities(times)
+        loaded = pickle.loads(pickle.dumps(chain, protocol=5))
+        np.testing.assert_array_equal(
+            loaded.computeTransientProbabilities(times), expected
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "chain.npz")
+            chain.save(filename)
+            loaded = otmarkov.ContinuousTimeMarkovChain.load(filename)
+        np.testing.assert_array_equal(
+            loaded.computeTransientProbabilities(times), expected
+        )
+
+    def test_InvalidGenerator(self):
+        self.assertRaises(
+            ValueError, otmarkov.ContinuousTimeMarkovChain, [[-1.0, 2.0], [1.0, -1.0]]
+        )
+        self.assertRaises(
+            ValueError, otmarkov.ContinuousTimeMarkovChain, [[1.0, -1.0], [1.0, -1.0]]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 - 2019 EDF.
+"""
+Test de la classe FirstPassageTimeEstimator.
+"""
+
+import openturns as ot
+import unittest
+import otmarkov
+import numpy as np
+
+
+def create_single_component_process(maximum_number_of_steps, vectorized=True):
+    """Create the single component process which stops after the horizon."""
+    model = ot.SymbolicFunction(["T", "cumulated_T"], ["T + cumulated_T"])
+    initial_state = [0.0]
+    indices = [1]
+    step_function = ot.ParametricFunction(model, indices, initial_state)
+    maximum_time = 20.0
+
+    def stop_callback(state):
+        return state[0] > maximum_time
+
+    def vectorized_stop_callback(states):
+        return states[:, 0] > maximum_time
+
+    if vectorized:
+        stop_sample_callback = vectorized_stop_callback
+    else:
+        stop_sample_callback = None
+    lambda_parameter = 0.1
+    distribution = ot.ComposedDistribution([ot.Exponential(lambda_parameter)])
+    markov_process = otmarkov.MarkovProcess(
+        step_function,
+        distribution,
+        stop_callback,
+        maximum_number_of_steps,
+        initial_state,
+        stop_sample_callback,
+    )
+    return markov_process
+
+
+class TestFirstPassageTimeEstimator(unittest.TestCase):
+    def test_SingleComponent(self):
+        ot.RandomGenerator.SetSeed(0)
+        markov_process = create_single_component_process(30)
+        estimator = otmarkov.FirstPassageTimeEstimator(markov_process)
+        self.assertRaises(ValueError, estimator.getHittingSteps)
+        size = 10000
+        estimator.run(size)
+        hitting_steps = estimator.getHittingSteps()
+        hitting_times = estimator.getHittingTimes()
+        censored = estimator.getCensored()
+        assert hitting_steps.shape == (size,)
+        assert hitting_times.shape == (size,)
+        assert not np.any(censored)
+
+        # The number of steps is larger than k if the sum of k
+        # exponential times is lower than the horizon, i.e. if there
+        # are at least k events of a Poisson process before the horizon
+        poisson = ot.Poisson(2.0)
+        steps = [1.0, 2.0, 3.0, 4.0]
+        survival_exact = [poisson.computeComplementaryCDF(k - 1) for k in steps]
+        survival = estimator.computeSurvivalFunction(steps)
+        print("survival=", survival)
+        print("survival_exact=", survival_exact)
+        np.testing.assert_allclose(survival, survival_exact, atol=0.02)
+        # Evaluate the smoothed function between the jumps
+        times = [k + 0.5 for k in steps]
+        survival = estimator.computeKernelSurvivalFunction(times, bandwidth=0.01)
+        np.testing.assert_allclose(survival, survival_exact, atol=0.02)
+        survival = estimator.computeKernelSurvivalFunction([0.0, 100.0])
+        np.testing.assert_allclose(survival, [1.0, 0.0], atol=1.0e-3)
+
+        # The time is the cumulated life time
+        estimator = otmarkov.FirstPassageTimeEstimator(markov_process, time_index=0)
+        estimator.run(100)
+        hitting_times = estimator.getHittingTimes()
+        assert np.all(hitting_times > 20.0)
+        survival = estimator.computeSurvivalFunction([20.0])
+        np.testing.assert_allclose(survival, [1.0])
+
+    def test_Censoring(self):
+        ot.RandomGenerator.SetSeed(0)
+        maximum_number_of_steps = 2
+        markov_process = create_single_component_process(
+            maximum_number_of_steps, vectorized=False
+        )
+        estimator = otmarkov.FirstPassageTimeEstimator(markov_process)
+        size = 10000
+        estimator.run(size)
+        hitting_steps = estimator.getHittingSteps()
+        censored = estimator.getCensored()
+        # The trajectories which do not stop within 2 steps are censored
+        poisson = ot.Poisson(2.0)
+        censored_probability = poisson.computeComplementaryCDF(1)
+        np.testing.assert_allclose(np.mean(censored), censored_probability, atol=0.02)
+        assert np.all(hitting_steps[censored] == maximum_number_of_steps)
+        survival = estimator.computeSurvivalFunction([1.0])
+        np.testing.assert_allclose(
+            survival, [poisson.computeComplementaryCDF(0)], atol=0.02
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
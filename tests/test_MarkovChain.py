@@ -6,6 +6,9 @@ Test de la classe MarkovChain.
 
 import openturns as ot
 import unittest
+import asyncio
+import time
+import pickle
 from numpy.testing import assert_allclose
 import otmarkov
 import numpy as np
@@ -32,6 +35,84 @@ def modelPQR(X):
     return [new_state]
 
 
+def modelTank(X):
+    """
+    The function which performs the step of a tank.
+
+    The inputs are:
+        * X[0] : inflow, the volume which enters the tank
+        * X[1] : duration, the duration of the step
+        * X[2] : level, the level of the tank
+        * X[3] : time, the current time
+
+    Parameters
+    ----------
+    X : ot.Point(4)
+        The input of the model.
+
+    Returns
+    -------
+    new_state : ot.Point(2)
+        The new level and the new time.
+    """
+    inflow, duration, level, time = X
+    new_level = 0.5 * level + inflow
+    new_time = time + duration
+    return [new_level, new_time]
+
+
+class LocalSimulationServer:
+    """A local server which performs the P * Q + R step after a delay."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.number_of_requests_in_flight = 0
+        self.maximum_number_of_requests_in_flight = 0
+
+    async def handle(self, reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            self.number_of_requests_in_flight += 1
+            self.maximum_number_of_requests_in_flight = max(
+                self.maximum_number_of_requests_in_flight,
+                self.number_of_requests_in_flight,
+            )
+            await asyncio.sleep(self.delay)
+            P, Q, R, state = [float(value) for value in line.split()]
+            writer.write(b"%r\n" % (state + P * Q + R))
+            await writer.drain()
+            self.number_of_requests_in_flight -= 1
+        writer.close()
+
+    async def simulate(self, markov_chain, size, concurrency):
+        server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        connections = []
+
+        async def async_step_function(state, X):
+            # Each coroutine uses its own connection
+            if not connections:
+                connections.append(await asyncio.open_connection("127.0.0.1", port))
+            reader, writer = connections.pop()
+            values = list(X) + list(state)
+            writer.write((" ".join([repr(value) for value in values]) + "\n").encode())
+            await writer.drain()
+            line = await reader.readline()
+            connections.append((reader, writer))
+            return [float(line)]
+
+        results = await markov_chain.simulateAsync(
+            size, async_step_function, concurrency
+        )
+        for reader, writer in connections:
+            writer.close()
+        server.close()
+        await server.wait_closed()
+        return results
+
+
 class TestMarkovChain(unittest.TestCase):
     def test_PQR(self):
 
@@ -118,6 +199,252 @@ class TestMarkovChain(unittest.TestCase):
         mu_exact = 4.0
         np.testing.assert_allclose(sample_mean, mu_exact, atol=atol)
 
+    def test_PQR_Symbolic(self):
+        # The step function is symbolic: the input is random,
+        # the parameter is the state, the output is the new state.
+        model = ot.SymbolicFunction(["P", "Q", "R", "state"], ["state + P * Q + R"])
+        initial_state = ot.Point([0.5])
+        indices = [3]
+        step_function = ot.ParametricFunction(model, indices, initial_state)
+
+        # Create the random vector.
+        P = ot.Normal()
+        Q = ot.Normal()
+        R = ot.WeibullMin()
+        distribution = ot.ComposedDistribution([P, Q, R])
+
+        # Create the Markov chain
+        number_of_steps = 4
+        markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, number_of_steps, initial_state
+        )
+        assert markov_chain.isSymbolic()
+        function = markov_chain.getAggregatedFunction()
+        evaluation = function.getEvaluation().getImplementation()
+        assert isinstance(evaluation, ot.SymbolicEvaluation)
+        assert function.getInputDimension() == 3 * number_of_steps
+        assert function.getOutputDescription() == step_function.getOutputDescription()
+
+        # Compare with the Python implementation
+        python_function = markov_chain.buildPythonAggregatedFunction()
+        aggregated_distribution = markov_chain.getAggregatedDistribution()
+        input_sample = aggregated_distribution.getSample(100)
+        assert_allclose(function(input_sample), python_function(input_sample))
+
+        # Estimate the mean with Monte-Carlo
+        random_vector = markov_chain.getCompositeRandomVector()
+        sampleSize = 10000
+        sample = random_vector.getSample(sampleSize)
+        sample_mean = sample.computeMean()[0]
+        relativeError = 10.0 / np.sqrt(sampleSize)
+        mu_exact = 4.5
+        assert_allclose(sample_mean, mu_exact, relativeError)
+
+    def test_PQR_Pickle(self):
+        model = ot.SymbolicFunction(["P", "Q", "R", "state"], ["state + P * Q + R"])
+        initial_state = ot.Point([0.5])
+        step_function = ot.ParametricFunction(model, [3], initial_state)
+        distribution = ot.ComposedDistribution([ot.Normal(), ot.Normal(), ot.Normal()])
+        number_of_steps = 4
+        markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, number_of_steps, initial_state
+        )
+        # The cached aggregated function is not serialized
+        markov_chain.getAggregatedFunction()
+        loaded = pickle.loads(pickle.dumps(markov_chain, protocol=5))
+        assert loaded.number_of_steps == number_of_steps
+        assert loaded.initial_state == initial_state
+        assert loaded.function is None
+        input_sample = markov_chain.getAggregatedDistribution().getSample(10)
+        assert_allclose(
+            loaded.computeFinalStates(input_sample),
+            markov_chain.computeFinalStates(input_sample),
+        )
+
+        # The results are serialized as arrays
+        results = [markov_chain.simulate() for i in range(5)]
+        loaded_results = pickle.loads(pickle.dumps(results, protocol=5))
+        for result, loaded_result in zip(results, loaded_results):
+            assert loaded_result.getHistory() == result.getHistory()
+
+    def test_PQR_Restart(self):
+        model = ot.SymbolicFunction(["P", "Q", "R", "state"], ["state + P * Q + R"])
+        initial_state = ot.Point([0.5])
+        step_function = ot.ParametricFunction(model, [3], initial_state)
+        distribution = ot.ComposedDistribution([ot.Normal(), ot.Normal(), ot.Normal()])
+        number_of_steps = 4
+        markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, number_of_steps, initial_state
+        )
+        # Continue the trajectories from intermediate states
+        size = 100
+        ot.RandomGenerator.SetSeed(0)
+        final_states = markov_chain.getFinalStateSample(size)
+        ot.RandomGenerator.SetSeed(0)
+        states = ot.Sample(size, initial_state)
+        states, steps = markov_chain.advanceStates(states, number_of_steps=1)
+        np.testing.assert_array_equal(steps, [1] * size)
+        states, steps = markov_chain.advanceStates(states, steps, number_of_steps=2)
+        np.testing.assert_array_equal(steps, [3] * size)
+        states, steps = markov_chain.advanceStates(states, steps, number_of_steps=5)
+        np.testing.assert_array_equal(steps, [number_of_steps] * size)
+        assert_allclose(states, final_states)
+
+        # Each trajectory has its own step counter
+        states = np.array([[0.5], [1.0], [2.0], [3.0]])
+        new_states, new_steps = markov_chain.advanceStates(
+            states, [0, 1, 3, 4], number_of_steps=2
+        )
+        np.testing.assert_array_equal(new_steps, [2, 3, 4, 4])
+        assert_allclose(new_states[3], states[3])
+        self.assertRaises(ValueError, markov_chain.advanceStates, states, [0, 1, 2, 5])
+        self.assertRaises(ValueError, markov_chain.advanceStates, np.zeros((4, 2)))
+
+    def test_PQR_BatchEvaluation(self):
+        # The evaluation on a sample must be consistent with the pointwise one
+        model_py = ot.PythonFunction(4, 1, modelPQR)
+        initial_state = ot.Point([0.0])
+        indices = [3]
+        step_function = ot.ParametricFunction(model_py, indices, initial_state)
+        P = ot.Normal()
+        Q = ot.Normal()
+        R = ot.WeibullMin()
+        distribution = ot.ComposedDistribution([P, Q, R])
+        number_of_steps = 3
+        markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, number_of_steps, initial_state
+        )
+        function = markov_chain.getAggregatedFunction()
+        input_sample = markov_chain.getAggregatedDistribution().getSample(10)
+        output_sample = function(input_sample)
+        for i in range(input_sample.getSize()):
+            assert_allclose(output_sample[i], function(input_sample[i]))
+        final_states = markov_chain.computeFinalStates(input_sample)
+        assert_allclose(final_states, output_sample)
+
+    def test_PQR_Lazy(self):
+        model = ot.SymbolicFunction(["P", "Q", "R", "state"], ["state + P * Q + R"])
+        initial_state = ot.Point([0.0])
+        indices = [3]
+        step_function = ot.ParametricFunction(model, indices, initial_state)
+        P = ot.Normal()
+        Q = ot.Normal()
+        R = ot.WeibullMin()
+        distribution = ot.ComposedDistribution([P, Q, R])
+
+        # The aggregated distribution and function are not created
+        number_of_steps = 1000
+        markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, number_of_steps, initial_state
+        )
+        assert markov_chain.aggregated_distribution is None
+        assert markov_chain.function is None
+        result = markov_chain.simulate()
+        assert result.getNumberOfSteps() == number_of_steps
+        assert markov_chain.aggregated_distribution is None
+        assert markov_chain.function is None
+
+        # Sample the aggregated input step by step
+        sampleSize = 20
+        input_sample = markov_chain.getAggregatedInputSample(sampleSize)
+        assert input_sample.shape == (sampleSize, 3 * number_of_steps)
+        sample_mean = np.mean(input_sample.reshape(-1, 3), axis=0)
+        assert_allclose(sample_mean, distribution.getMean(), atol=0.1)
+        final_states = markov_chain.computeFinalStates(input_sample)
+        assert final_states.shape == (sampleSize, 1)
+
+        # Create the distribution and the function on demand
+        aggregated_distribution = markov_chain.getAggregatedDistribution()
+        assert aggregated_distribution.getDimension() == 3 * number_of_steps
+        assert markov_chain.getAggregatedDistribution() is aggregated_distribution
+        function = markov_chain.getAggregatedFunction()
+        assert markov_chain.getAggregatedFunction() is function
+
+    def test_PQR_Async(self):
+        model_py = ot.PythonFunction(4, 1, modelPQR)
+        initial_state = ot.Point([0.0])
+        indices = [3]
+        step_function = ot.ParametricFunction(model_py, indices, initial_state)
+        P = ot.Normal()
+        Q = ot.Normal()
+        R = ot.WeibullMin()
+        distribution = ot.ComposedDistribution([P, Q, R])
+        number_of_steps = 3
+        markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, number_of_steps, initial_state
+        )
+
+        # Without an asynchronous step function
+        results = asyncio.run(markov_chain.simulateAsync(5, concurrency=2))
+        assert len(results) == 5
+        for result in results:
+            assert result.getNumberOfSteps() == number_of_steps
+
+        # With a local simulation server
+        delay = 0.02
+        size = 20
+        concurrency = 10
+        server = LocalSimulationServer(delay)
+        start = time.time()
+        results = asyncio.run(server.simulate(markov_chain, size, concurrency))
+        elapsed = time.time() - start
+        print("elapsed=", elapsed)
+        assert len(results) == size
+        for result in results:
+            history = result.getHistory()
+            assert len(history) == number_of_steps + 1
+            assert history[-1].getDimension() == 1
+        # The latencies overlap
+        assert server.maximum_number_of_requests_in_flight == concurrency
+        assert elapsed < 0.5 * size * number_of_steps * delay
+
+    def test_Tank(self):
+        # The state has dimension 2
+        model_py = ot.PythonFunction(4, 2, modelTank)
+        initial_state = ot.Point([1.0, 0.0])
+        indices = [2, 3]
+        step_function = ot.ParametricFunction(model_py, indices, initial_state)
+        distribution = ot.ComposedDistribution([ot.Uniform(0.0, 2.0), ot.Exponential()])
+        number_of_steps = 10
+        markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, number_of_steps, initial_state
+        )
+        assert markov_chain.getStateDimension() == 2
+
+        # The aggregated function
+        function = markov_chain.getAggregatedFunction()
+        assert function.getOutputDimension() == 2
+        input_sample = markov_chain.getAggregatedInputSample(10)
+        output_sample = function(input_sample)
+        for i in range(10):
+            assert_allclose(output_sample[i], function(input_sample[i]))
+
+        # Batched simulations
+        ot.RandomGenerator.SetSeed(0)
+        sample = markov_chain.getFinalStateSample(10000)
+        assert sample.shape == (10000, 2)
+        assert sample.flags["C_CONTIGUOUS"]
+        # The level converges to 2 and the time is the sum of the durations
+        mean_exact = [2.0 * (1.0 - 0.5**number_of_steps) + 0.5**number_of_steps, 10.0]
+        assert_allclose(np.mean(sample, axis=0), mean_exact, rtol=0.02)
+        histories = markov_chain.getHistorySample(5)
+        assert histories.shape == (5, number_of_steps + 1, 2)
+        random_vector = markov_chain.getCompositeRandomVector()
+        assert random_vector.getSample(5).getDimension() == 2
+        result = markov_chain.simulate()
+        assert result.getFinalState().getDimension() == 2
+
+        # The dimensions must be consistent
+        step_function = ot.ParametricFunction(model_py, [3], [0.0])
+        self.assertRaises(
+            ValueError,
+            otmarkov.MarkovChain,
+            step_function,
+            ot.ComposedDistribution([ot.Uniform(), ot.Uniform(), ot.Uniform()]),
+            number_of_steps,
+            [0.0],
+        )
+
     def test_PQR_simulation(self):
         model_py = ot.PythonFunction(4, 1, modelPQR)
 
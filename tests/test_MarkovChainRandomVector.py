@@ -108,6 +108,74 @@ class TestMarkovChainRandomVector(unittest.TestCase):
         mu_exact = 4.0
         np.testing.assert_allclose(sample_mean, mu_exact, relativeError)
 
+    def test_PQR_Affine(self):
+        model = ot.SymbolicFunction(["P", "Q", "R", "state"], ["state + P * Q + R"])
+        initial_state = ot.Point([1.0])
+        indices = [3]
+        step_function = ot.ParametricFunction(model, indices, initial_state)
+
+        # Create the distribution of the random input.
+        P = ot.Normal()
+        Q = ot.Normal()
+        R = ot.WeibullMin()
+        distribution = ot.ComposedDistribution([P, Q, R])
+
+        # The step is affine: state_{n+1} = state_n + P * Q + R
+        number_of_steps = 4
+        mc_random_vector = otmarkov.MarkovChainRandomVector(
+            step_function,
+            distribution,
+            number_of_steps,
+            initial_state,
+            state_matrix=[[1.0]],
+        )
+        random_vector = ot.RandomVector(mc_random_vector)
+
+        # The sample is generated for all trajectories at once
+        sampleSize = 10000
+        sample = random_vector.getSample(sampleSize)
+        assert sample.getSize() == sampleSize
+        assert sample.getDimension() == 1
+        relativeError = 10.0 / np.sqrt(sampleSize)
+        mu_exact = 5.0
+        np.testing.assert_allclose(sample.computeMean()[0], mu_exact, relativeError)
+
+        # The variance of P * Q + R is 2
+        mean = random_vector.getMean()
+        covariance = random_vector.getCovariance()
+        print("mean=", mean)
+        print("covariance=", covariance)
+        np.testing.assert_allclose(mean[0], mu_exact, relativeError)
+        np.testing.assert_allclose(covariance[0, 0], 8.0, 0.1)
+
+    def test_Dimension2(self):
+        # The state is the level of a tank and the time
+        model = ot.SymbolicFunction(
+            ["inflow", "duration", "level", "time"],
+            ["0.5 * level + inflow", "time + duration"],
+        )
+        initial_state = ot.Point([1.0, 0.0])
+        indices = [2, 3]
+        step_function = ot.ParametricFunction(model, indices, initial_state)
+        distribution = ot.ComposedDistribution([ot.Uniform(0.0, 2.0), ot.Exponential()])
+        number_of_steps = 10
+        mc_random_vector = otmarkov.MarkovChainRandomVector(
+            step_function,
+            distribution,
+            number_of_steps,
+            initial_state,
+            state_matrix=[[0.5, 0.0], [0.0, 1.0]],
+        )
+        random_vector = ot.RandomVector(mc_random_vector)
+        assert random_vector.getDimension() == 2
+        assert random_vector.getRealization().getDimension() == 2
+        sample = random_vector.getSample(1000)
+        assert sample.getDimension() == 2
+        mean = random_vector.getMean()
+        mean_exact = [2.0 * (1.0 - 0.5**number_of_steps) + 0.5**number_of_steps, 10.0]
+        np.testing.assert_allclose(mean, mean_exact, rtol=0.02)
+        np.testing.assert_allclose(sample.computeMean(), mean_exact, rtol=0.05)
+
     def test_SingleComponent(self):
         model_py = ot.PythonFunction(2, 1, single_component_model)
 
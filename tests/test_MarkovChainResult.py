@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 - 2019 EDF.
+"""
+Test de la classe MarkovChainResult.
+"""
+
+import openturns as ot
+import unittest
+import otmarkov
+import numpy as np
+import pickle
+import tempfile
+import os
+
+
+class TestMarkovChainResult(unittest.TestCase):
+    def test_History(self):
+        history = [ot.Point([0.0, 1.0]), ot.Point([2.0, 3.0]), ot.Point([4.0, 5.0])]
+        result = otmarkov.MarkovChainResult(history)
+        assert result.getNumberOfSteps() == 2
+        assert result.getInitialState() == history[0]
+        assert result.getFinalState() == history[-1]
+        states = result.getStates()
+        assert states.shape == (3, 2)
+        np.testing.assert_array_equal(states, np.array(history))
+
+        # From an array of states
+        result = otmarkov.MarkovChainResult(states)
+        assert result.getNumberOfSteps() == 2
+        assert result.getHistory() == history
+        assert isinstance(result.getFinalState(), ot.Point)
+
+    def test_Pickle(self):
+        states = np.arange(2000.0).reshape(1000, 2)
+        result = otmarkov.MarkovChainResult(list(ot.Sample(states)))
+        # The array of states is transferred out-of-band
+        buffers = []
+        data = pickle.dumps(result, protocol=5, buffer_callback=buffers.append)
+        assert len(buffers) == 1
+        assert len(data) < 1000
+        loaded = pickle.loads(data, buffers=buffers)
+        np.testing.assert_array_equal(loaded.getStates(), states)
+        assert loaded.getNumberOfSteps() == 999
+        assert loaded.getFinalState() == ot.Point([1998.0, 1999.0])
+        # In-band
+        loaded = pickle.loads(pickle.dumps(result))
+        np.testing.assert_array_equal(loaded.getStates(), states)
+
+    def test_SaveLoad(self):
+        states = np.arange(6.0).reshape(3, 2)
+        result = otmarkov.MarkovChainResult(states)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "result.npz")
+            result.save(filename)
+            loaded = otmarkov.MarkovChainResult.load(filename)
+        np.testing.assert_array_equal(loaded.getStates(), states)
+
+
+if __name__ == "__main__":
+    unittest.main()
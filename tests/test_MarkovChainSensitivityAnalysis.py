@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 - 2019 EDF.
+"""
+Test de la classe MarkovChainSensitivityAnalysis.
+"""
+
+import openturns as ot
+import unittest
+import otmarkov
+import numpy as np
+
+
+def create_PQR_chain(number_of_steps):
+    """Create the P * Q + R Markov chain with a symbolic step function."""
+    model = ot.SymbolicFunction(["P", "Q", "R", "state"], ["state + P * Q + R"])
+    initial_state = ot.Point([0.0])
+    indices = [3]
+    step_function = ot.ParametricFunction(model, indices, initial_state)
+    P = ot.Normal()
+    Q = ot.Normal()
+    R = ot.WeibullMin()
+    distribution = ot.ComposedDistribution([P, Q, R])
+    markov_chain = otmarkov.MarkovChain(
+        step_function, distribution, number_of_steps, initial_state
+    )
+    return markov_chain
+
+
+class TestMarkovChainSensitivityAnalysis(unittest.TestCase):
+    def test_PQR(self):
+        ot.RandomGenerator.SetSeed(0)
+        number_of_steps = 2
+        markov_chain = create_PQR_chain(number_of_steps)
+
+        # The variance of P * Q and the variance of R are both equal to 1.
+        # Hence, each step contributes to 1 / number_of_steps of the variance.
+        first_order_exact = [0.0, 0.0, 0.25] * number_of_steps
+        total_order_exact = [0.25, 0.25, 0.25] * number_of_steps
+        for estimator in ["Saltelli", "Martinez"]:
+            size = 5000
+            analysis = otmarkov.MarkovChainSensitivityAnalysis(
+                markov_chain, size, estimator, block_size=1200
+            )
+            number_of_groups = 3 * number_of_steps + 3 + number_of_steps
+            assert analysis.getNumberOfEvaluations() == (number_of_groups + 2) * size
+            analysis.run()
+            first_order = analysis.getFirstOrderIndices()
+            total_order = analysis.getTotalOrderIndices()
+            print(estimator, "first_order=", first_order)
+            print(estimator, "total_order=", total_order)
+            np.testing.assert_allclose(first_order, first_order_exact, atol=0.1)
+            np.testing.assert_allclose(total_order, total_order_exact, atol=0.1)
+            # Per variable, across steps
+            first_order = analysis.getFirstOrderIndicesPerVariable()
+            total_order = analysis.getTotalOrderIndicesPerVariable()
+            np.testing.assert_allclose(first_order, [0.0, 0.0, 0.5], atol=0.1)
+            np.testing.assert_allclose(total_order, [0.5, 0.5, 0.5], atol=0.1)
+            # Per step, across variables
+            first_order = analysis.getFirstOrderIndicesPerStep()
+            total_order = analysis.getTotalOrderIndicesPerStep()
+            np.testing.assert_allclose(first_order, [0.5, 0.5], atol=0.1)
+            np.testing.assert_allclose(total_order, [0.5, 0.5], atol=0.1)
+
+    def test_NotRun(self):
+        markov_chain = create_PQR_chain(2)
+        analysis = otmarkov.MarkovChainSensitivityAnalysis(markov_chain, 10)
+        self.assertRaises(ValueError, analysis.getFirstOrderIndices)
+        self.assertRaises(
+            ValueError,
+            otmarkov.MarkovChainSensitivityAnalysis,
+            markov_chain,
+            10,
+            "Jansen",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
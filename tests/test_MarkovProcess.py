@@ -6,11 +6,88 @@ Test de la classe MarkovProcess.
 
 import openturns as ot
 import unittest
+import asyncio
 import otmarkov
 import numpy as np
 
 
 class TestMarkovProcess(unittest.TestCase):
+    def test_Dimension2(self):
+        # The state is the level of a tank and the time
+        model = ot.SymbolicFunction(
+            ["inflow", "duration", "level", "time"],
+            ["0.5 * level + inflow", "time + duration"],
+        )
+        initial_state = [1.0, 0.0]
+        indices = [2, 3]
+        step_function = ot.ParametricFunction(model, indices, initial_state)
+        distribution = ot.ComposedDistribution([ot.Uniform(0.0, 2.0), ot.Exponential()])
+
+        def stop_callback(state):
+            return state[1] > 5.0
+
+        maximum_number_of_steps = 20
+        markov_process = otmarkov.MarkovProcess(
+            step_function,
+            distribution,
+            stop_callback,
+            maximum_number_of_steps,
+            initial_state,
+        )
+        assert markov_process.getStateDimension() == 2
+        result = markov_process.simulate()
+        assert result.getFinalState().getDimension() == 2
+        histories, lengths = markov_process.getHistorySample(100)
+        assert histories.shape == (100, maximum_number_of_steps + 1, 2)
+        estimator = otmarkov.FirstPassageTimeEstimator(markov_process, time_index=1)
+        estimator.run(100)
+        times = estimator.getHittingTimes()
+        censored = estimator.getCensored()
+        assert np.all(times[~censored] > 5.0)
+
+    def test_Restart(self):
+        # The state is the cumulated life time of a component
+        model = ot.SymbolicFunction(["T", "cumulated_T"], ["T + cumulated_T"])
+        initial_state = [0.0]
+        step_function = ot.ParametricFunction(model, [1], initial_state)
+        distribution = ot.ComposedDistribution([ot.Exponential(0.1)])
+        maximum_number_of_steps = 10
+
+        def stop_callback(state):
+            return state[0] > 30.0
+
+        markov_process = otmarkov.MarkovProcess(
+            step_function,
+            distribution,
+            stop_callback,
+            maximum_number_of_steps,
+            initial_state,
+        )
+        # Advance the trajectories by chunks of 3 steps
+        size = 1000
+        ot.RandomGenerator.SetSeed(0)
+        states = np.zeros((size, 1))
+        steps = None
+        for i in range(4):
+            states, steps, stopped = markov_process.advanceStates(
+                states, steps, number_of_steps=3
+            )
+            assert np.all(steps <= 3 * (i + 1))
+        assert np.all(steps <= maximum_number_of_steps)
+        np.testing.assert_array_equal(stopped, states[:, 0] > 30.0)
+        # The trajectories which are not stopped reach the maximum number of steps
+        np.testing.assert_array_equal(steps[~stopped], maximum_number_of_steps)
+        # The stopped trajectories are not advanced
+        new_states, new_steps, new_stopped = markov_process.advanceStates(
+            states[stopped], steps[stopped]
+        )
+        np.testing.assert_array_equal(new_states, states[stopped])
+        np.testing.assert_array_equal(new_steps, steps[stopped])
+        assert np.all(new_stopped)
+        # The sum of 10 exponential variables is a Gamma variable
+        probability = ot.Gamma(maximum_number_of_steps, 0.1).computeCDF(30.0)
+        np.testing.assert_allclose(np.mean(stopped), 1.0 - probability, atol=0.05)
+
     def test_SingleComponent(self):
         def single_component_model(X):
             """
@@ -117,6 +194,25 @@ class TestMarkovProcess(unittest.TestCase):
         number_of_result_steps = result.getNumberOfSteps()
         print("number_of_steps=", number_of_result_steps)
 
+        # Simulate with an asynchronous step
+        async def async_step_function(state, X):
+            await asyncio.sleep(0.001)
+            return [state[0] + X[0]]
+
+        size = 10
+        results = asyncio.run(
+            markov_process.simulateAsync(size, async_step_function, concurrency=4)
+        )
+        assert len(results) == size
+        for result in results:
+            history = result.getHistory()
+            number_of_result_steps = result.getNumberOfSteps()
+            assert number_of_result_steps <= maximum_number_of_steps
+            if number_of_result_steps < maximum_number_of_steps:
+                assert history[-1][0] > maximum_time
+            for i in range(number_of_result_steps - 1):
+                assert history[i + 1][0] <= maximum_time
+
 
 if __name__ == "__main__":
     unittest.main()
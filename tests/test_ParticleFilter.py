@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 - 2019 EDF.
+"""
+Test de la classe ParticleFilter.
+"""
+
+import openturns as ot
+import unittest
+import otmarkov
+import numpy as np
+
+
+def compute_kalman_filter(a, q, r, initial_state, observations):
+    """Compute the filtered mean and variance of a Gaussian AR(1) chain."""
+    mean = initial_state
+    variance = 0.0
+    mean_history = []
+    variance_history = []
+    for observation in observations:
+        # Prediction
+        mean = a * mean
+        variance = a**2 * variance + q
+        # Correction
+        gain = variance / (variance + r)
+        mean = mean + gain * (observation - mean)
+        variance = (1.0 - gain) * variance
+        mean_history.append(mean)
+        variance_history.append(variance)
+    return np.array(mean_history), np.array(variance_history)
+
+
+class TestParticleFilter(unittest.TestCase):
+    def setUp(self):
+        # The hidden state: x_{n+1} = a x_n + E, E ~ N(0, q)
+        self.a = 0.9
+        self.q = 0.5**2
+        self.r = 0.3**2
+        model = ot.SymbolicFunction(["E", "x"], ["%r * x + E" % (self.a)])
+        initial_state = ot.Point([1.0])
+        step_function = ot.ParametricFunction(model, [1], initial_state)
+        distribution = ot.ComposedDistribution([ot.Normal(0.0, np.sqrt(self.q))])
+        number_of_steps = 20
+        self.markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, number_of_steps, initial_state
+        )
+        # The observations: y_n = x_n + V, V ~ N(0, r)
+        ot.RandomGenerator.SetSeed(0)
+        history = self.markov_chain.getHistorySample(1)[0, 1:, 0]
+        noise = np.array(ot.Normal(0.0, np.sqrt(self.r)).getSample(number_of_steps))
+        self.observations = history + noise[:, 0]
+
+    def log_likelihood(self, states, observation):
+        return -0.5 * (observation - states[:, 0]) ** 2 / self.r
+
+    def test_Kalman(self):
+        mean_exact, variance_exact = compute_kalman_filter(
+            self.a, self.q, self.r, 1.0, self.observations
+        )
+        for resampling in ["Systematic", "Stratified"]:
+            ot.RandomGenerator.SetSeed(1)
+            number_of_particles = 10000
+            particle_filter = otmarkov.ParticleFilter(
+                self.markov_chain,
+                self.log_likelihood,
+                number_of_particles,
+                resampling=resampling,
+            )
+            particle_filter.run(self.observations)
+            assert particle_filter.getNumberOfSteps() == len(self.observations)
+            mean_history = particle_filter.getMeanHistory()
+            assert mean_history.shape == (len(self.observations), 1)
+            np.testing.assert_allclose(mean_history[:, 0], mean_exact, atol=0.03)
+            # The particles are resampled at each step
+            assert np.all(particle_filter.getResampledHistory())
+            np.testing.assert_allclose(
+                particle_filter.computeCovariance()[0, 0],
+                variance_exact[-1],
+                rtol=0.1,
+            )
+            effective_sample_size = particle_filter.getEffectiveSampleSizeHistory()
+            assert np.all(effective_sample_size > 1.0)
+            assert np.all(effective_sample_size <= number_of_particles)
+            time_history = particle_filter.getTimeHistory()
+            assert len(time_history) == len(self.observations)
+            assert np.all(time_history >= 0.0)
+
+    def test_Online(self):
+        # Resample only when the effective sample size is low
+        ot.RandomGenerator.SetSeed(2)
+        number_of_particles = 1000
+        particle_filter = otmarkov.ParticleFilter(
+            self.markov_chain,
+            self.log_likelihood,
+            number_of_particles,
+            resampling_threshold=0.5,
+        )
+        for observation in self.observations:
+            particle_filter.update(observation)
+            np.testing.assert_allclose(np.sum(particle_filter.getWeights()), 1.0)
+        resampled = particle_filter.getResampledHistory()
+        effective_sample_size = particle_filter.getEffectiveSampleSizeHistory()
+        np.testing.assert_array_equal(
+            resampled, effective_sample_size <= 0.5 * number_of_particles
+        )
+        assert particle_filter.getParticles().shape == (number_of_particles, 1)
+
+    def test_Invalid(self):
+        self.assertRaises(
+            ValueError,
+            otmarkov.ParticleFilter,
+            self.markov_chain,
+            self.log_likelihood,
+            100,
+            resampling="Multinomial",
+        )
+        self.assertRaises(
+            ValueError,
+            otmarkov.ParticleFilter,
+            self.markov_chain,
+            self.log_likelihood,
+            100,
+            initial_particles=np.zeros((10, 1)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
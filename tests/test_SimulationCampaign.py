@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 - 2019 EDF.
+"""
+Test de la classe SimulationCampaign.
+"""
+
+import openturns as ot
+import unittest
+import otmarkov
+import numpy as np
+import concurrent.futures
+
+
+class FlakyExecutor:
+    """An executor where the first submission of each chunk fails."""
+
+    def __init__(self):
+        self.submitted_seeds = set()
+
+    def submit(self, function, *args):
+        future = concurrent.futures.Future()
+        chunk_seed = args[2]
+        if chunk_seed not in self.submitted_seeds:
+            self.submitted_seeds.add(chunk_seed)
+            future.set_exception(RuntimeError("The worker is lost"))
+        else:
+            future.set_result(function(*args))
+        return future
+
+
+class FailingExecutor:
+    """An executor with only a map method, where all the chunks fail."""
+
+    def map(self, function, *iterables):
+        return [(None, RuntimeError("The worker is lost")) for args in zip(*iterables)]
+
+
+def stop_callback(state):
+    return state[0] > 30.0
+
+
+class TestSimulationCampaign(unittest.TestCase):
+    def setUp(self):
+        model = ot.SymbolicFunction(["P", "Q", "R", "state"], ["state + P * Q + R"])
+        initial_state = ot.Point([0.5])
+        step_function = ot.ParametricFunction(model, [3], initial_state)
+        distribution = ot.ComposedDistribution([ot.Normal(), ot.Normal(), ot.Normal()])
+        number_of_steps = 4
+        self.markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, number_of_steps, initial_state
+        )
+
+    def test_Reproducible(self):
+        size = 1000
+        campaign = otmarkov.SimulationCampaign(self.markov_chain, size, chunk_size=300)
+        assert campaign.getNumberOfChunks() == 4
+        final_states = campaign.run()
+        assert final_states.shape == (size, 1)
+        np.testing.assert_allclose(np.mean(final_states), 0.5, atol=0.2)
+        # The sample does not depend on the executor
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            campaign = otmarkov.SimulationCampaign(
+                self.markov_chain, size, chunk_size=300, executor=executor
+            )
+            np.testing.assert_array_equal(campaign.run(), final_states)
+            # The chunks are streamed as they finish
+            chunks = dict(campaign.iterateChunks())
+        assert sorted(chunks) == [0, 1, 2, 3]
+        np.testing.assert_array_equal(chunks[3], final_states[900:])
+        # Another seed
+        campaign = otmarkov.SimulationCampaign(
+            self.markov_chain, size, chunk_size=300, seed=1
+        )
+        assert not np.array_equal(campaign.run(), final_states)
+
+    def test_Retry(self):
+        size = 100
+        campaign = otmarkov.SimulationCampaign(self.markov_chain, size, chunk_size=30)
+        final_states = campaign.run()
+        assert campaign.getNumberOfRetries() == 0
+        campaign = otmarkov.SimulationCampaign(
+            self.markov_chain, size, chunk_size=30, executor=FlakyExecutor()
+        )
+        np.testing.assert_array_equal(campaign.run(), final_states)
+        assert campaign.getNumberOfRetries() == 4
+        # Too many failures
+        campaign = otmarkov.SimulationCampaign(
+            self.markov_chain, size, chunk_size=30, executor=FailingExecutor()
+        )
+        self.assertRaises(RuntimeError, campaign.run)
+        assert campaign.getNumberOfRetries() == 2 * campaign.getNumberOfChunks()
+
+    def test_MarkovProcess(self):
+        model = ot.SymbolicFunction(["T", "cumulated_T"], ["T + cumulated_T"])
+        initial_state = [0.0]
+        step_function = ot.ParametricFunction(model, [1], initial_state)
+        distribution = ot.ComposedDistribution([ot.Exponential(0.1)])
+        maximum_number_of_steps = 10
+        markov_process = otmarkov.MarkovProcess(
+            step_function,
+            distribution,
+            stop_callback,
+            maximum_number_of_steps,
+            initial_state,
+        )
+        campaign = otmarkov.SimulationCampaign(
+            markov_process, 250, chunk_size=100, method_name="getHistorySample"
+        )
+        histories, lengths = campaign.run()
+        assert histories.shape == (250, maximum_number_of_steps + 1, 1)
+        assert lengths.shape == (250,)
+        self.assertRaises(
+            ValueError,
+            otmarkov.SimulationCampaign,
+            markov_process,
+            250,
+            method_name="getSample",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
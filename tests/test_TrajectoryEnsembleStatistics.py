@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 - 2019 EDF.
+"""
+Test de la classe TrajectoryEnsembleStatistics.
+"""
+
+import openturns as ot
+import unittest
+import otmarkov
+import numpy as np
+
+
+class TestTrajectoryEnsembleStatistics(unittest.TestCase):
+    def test_MarkovChain(self):
+        ot.RandomGenerator.SetSeed(0)
+        model = ot.SymbolicFunction(["T", "cumulated_T"], ["T + cumulated_T"])
+        initial_state = ot.Point([0.0])
+        step_function = ot.ParametricFunction(model, [1], initial_state)
+        lambda_parameter = 0.1
+        distribution = ot.ComposedDistribution([ot.Exponential(lambda_parameter)])
+        number_of_steps = 5
+        markov_chain = otmarkov.MarkovChain(
+            step_function, distribution, number_of_steps, initial_state
+        )
+
+        # Add the trajectories by chunks
+        statistics = otmarkov.TrajectoryEnsembleStatistics()
+        all_histories = []
+        for i in range(4):
+            histories = markov_chain.getHistorySample(2500)
+            assert histories.shape == (2500, number_of_steps + 1, 1)
+            statistics.add(histories)
+            all_histories.append(histories)
+        all_histories = np.concatenate(all_histories)
+        np.testing.assert_array_equal(statistics.getCount(), [10000] * 6)
+        mean = statistics.computeMean()
+        standard_deviation = statistics.computeStandardDeviation()
+        np.testing.assert_allclose(mean, np.mean(all_histories, axis=0))
+        np.testing.assert_allclose(
+            standard_deviation, np.std(all_histories, axis=0, ddof=1)
+        )
+        # The state at step k is Gamma(k, lambda)
+        steps = np.arange(number_of_steps + 1)
+        np.testing.assert_allclose(mean[:, 0], steps / lambda_parameter, rtol=0.05)
+        quantiles = statistics.computeQuantile([0.1, 0.5, 0.9])
+        assert quantiles.shape == (3, number_of_steps + 1, 1)
+        np.testing.assert_allclose(
+            quantiles, np.quantile(all_histories, [0.1, 0.5, 0.9], axis=0)
+        )
+        lower, upper = statistics.computeEnvelope(0.2)
+        np.testing.assert_allclose(lower, quantiles[0])
+        np.testing.assert_allclose(upper, quantiles[2])
+
+    def test_MarkovProcess(self):
+        ot.RandomGenerator.SetSeed(0)
+        model = ot.SymbolicFunction(["T", "cumulated_T"], ["T + cumulated_T"])
+        initial_state = [0.0]
+        step_function = ot.ParametricFunction(model, [1], initial_state)
+        distribution = ot.ComposedDistribution([ot.Exponential(0.1)])
+
+        def stop_callback(state):
+            return state[0] > 20.0
+
+        maximum_number_of_steps = 10
+        markov_process = otmarkov.MarkovProcess(
+            step_function,
+            distribution,
+            stop_callback,
+            maximum_number_of_steps,
+            initial_state,
+        )
+        histories, lengths = markov_process.getHistorySample(1000)
+        assert histories.shape == (1000, maximum_number_of_steps + 1, 1)
+        for i in range(1000):
+            # The last state is after the horizon and the others are before
+            length = lengths[i]
+            assert histories[i, length - 1, 0] > 20.0
+            assert np.all(histories[i, : length - 1, 0] <= 20.0)
+            assert np.all(np.isnan(histories[i, length:, 0]))
+        statistics = otmarkov.TrajectoryEnsembleStatistics()
+        statistics.add(histories, lengths)
+        count = statistics.getCount()
+        np.testing.assert_array_equal(
+            count, [np.sum(lengths > k) for k in range(maximum_number_of_steps + 1)]
+        )
+        mean = statistics.computeMean()
+        median = statistics.computeQuantile([0.5])[0]
+        for k in range(maximum_number_of_steps + 1):
+            values = histories[lengths > k, k, 0]
+            if len(values) > 0:
+                np.testing.assert_allclose(mean[k, 0], np.mean(values))
+                np.testing.assert_allclose(median[k, 0], np.median(values))
+            else:
+                assert np.isnan(mean[k, 0])
+
+        # The results of the process simulations
+        results = [markov_process.simulate() for i in range(20)]
+        statistics = otmarkov.TrajectoryEnsembleStatistics(store_values=False)
+        statistics.addResults(results)
+        assert statistics.getCount()[0] == 20
+        self.assertRaises(ValueError, statistics.computeQuantile, [0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Copyright 2018 - 2019 EDF.
+"""
+Test de l'import paresseux du module otmarkov.
+"""
+
+import unittest
+import subprocess
+import sys
+import os
+
+# The directory which contains the otmarkov package
+root_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def runPython(code):
+    """Run the code in a new interpreter and return its standard output."""
+    output = subprocess.check_output(
+        [sys.executable, "-c", code], cwd=root_directory, text=True
+    )
+    return output.strip()
+
+
+class TestImport(unittest.TestCase):
+    def test_LazyImport(self):
+        output = runPython(
+            "import sys\n"
+            "import otmarkov\n"
+            "print('openturns' in sys.modules, 'numpy' in sys.modules)\n"
+        )
+        assert output == "False False"
+        output = runPython(
+            "import sys\n"
+            "import otmarkov\n"
+            "otmarkov.MarkovChain\n"
+            "print('openturns' in sys.modules)\n"
+        )
+        assert output == "True"
+        assert "MarkovChain" in runPython("import otmarkov; print(dir(otmarkov))")
+
+    def test_NumPyOnly(self):
+        # A Markov process with a vectorized step and a NumPy distribution
+        code = """
+import sys
+import numpy as np
+import otmarkov
+
+
+class Exponential:
+    def __init__(self, rate, seed):
+        self.rate = rate
+        self.generator = np.random.default_rng(seed)
+
+    def getSample(self, size):
+        return self.generator.exponential(1.0 / self.rate, (size, 1))
+
+
+def step(states, X):
+    return states + X
+
+
+markov_process = otmarkov.MarkovProcess(
+    step,
+    Exponential(0.1, 0),
+    None,
+    50,
+    [0.0],
+    stop_sample_callback=lambda states: states[:, 0] > 30.0,
+)
+histories, lengths = markov_process.getHistorySample(1000)
+statistics = otmarkov.TrajectoryEnsembleStatistics()
+statistics.add(histories, lengths)
+estimator = otmarkov.FirstPassageTimeEstimator(markov_process)
+estimator.run(1000)
+survival = estimator.computeSurvivalFunction([0.0, 1.0, 50.0])
+chain = otmarkov.ContinuousTimeMarkovChain([[-1.0, 1.0], [2.0, -2.0]])
+states = chain.getStateSample(100, [0.0, 1.0], np.random.default_rng(0))
+print(
+    histories.shape,
+    statistics.getCount()[0],
+    survival[0],
+    survival[-1],
+    states.shape,
+    "openturns" in sys.modules,
+)
+"""
+        output = runPython(code)
+        assert output == "(1000, 51, 1) 1000 1.0 0.0 (100, 2) False"
+
+
+if __name__ == "__main__":
+    unittest.main()